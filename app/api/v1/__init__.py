@@ -5,6 +5,11 @@ from .inspections import router as inspections_router
 from .ppe_compliance import router as ppe_compliance_router
 from .locations import router as locations_router
 from .employees import router as employees_router
+from .dashboard import router as dashboard_router
+from .export import router as export_router
+from .search import router as search_router
+from .cache import router as cache_router
+from .analytics import router as analytics_router
 
 api_router = APIRouter()
 
@@ -15,3 +20,8 @@ api_router.include_router(inspections_router)
 api_router.include_router(ppe_compliance_router)
 api_router.include_router(locations_router)
 api_router.include_router(employees_router)
+api_router.include_router(dashboard_router)
+api_router.include_router(export_router)
+api_router.include_router(search_router)
+api_router.include_router(cache_router)
+api_router.include_router(analytics_router)
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Optional
+from app.database import get_db
+from app.services.incident_rollups import ROLLUP_GROUPS, ROLLUP_PERIODS, get_incident_rollups
+from app.services.ppe_analytics import DEFAULT_PERCENTILES, PPE_PERIODS, get_ppe_compliance_analytics
+from app.services.serializers import json_response
+from app.services.versions import conditional_get
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+@router.get("/incidents", dependencies=[Depends(conditional_get("safety_incidents"))])
+def get_incident_trends(
+    response: Response,
+    period: str = Query("month", pattern="^(" + "|".join(ROLLUP_PERIODS) + ")$", description="day, week or month"),
+    date_from: Optional[date] = Query(None, description="First day to include; its whole bucket is counted"),
+    date_to: Optional[date] = Query(None, description="Buckets starting before this day are counted"),
+    location_id: Optional[List[int]] = Query(None),
+    injury_severity: Optional[List[str]] = Query(None),
+    group_by: Optional[str] = Query(None, description="Comma-separated: location_id, injury_severity"),
+    db: Session = Depends(get_db)
+):
+    """Get incident counts per day, week or month from the maintained rollups.
+
+    Counts are read from incident_rollups instead of scanning safety_incidents.
+    """
+    groups = [group.strip() for group in (group_by or "").split(",") if group.strip()]
+    unknown = sorted(set(groups) - set(ROLLUP_GROUPS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by fields: {', '.join(unknown)}")
+    return json_response(
+        get_incident_rollups(db, period, date_from, date_to, location_id, injury_severity, groups),
+        response
+    )
+
+@router.get("/ppe-compliance", dependencies=[Depends(conditional_get("ppe_compliance", "employees"))])
+def get_ppe_compliance_summary(
+    response: Response,
+    period: str = Query("month", pattern="^(" + "|".join(PPE_PERIODS) + ")$", description="day, week or month"),
+    date_from: Optional[date] = Query(None, description="Earliest assessment_date, inclusive"),
+    date_to: Optional[date] = Query(None, description="Latest assessment_date, exclusive"),
+    department: Optional[List[str]] = Query(None),
+    percentiles: Optional[str] = Query(None, description="Comma-separated percentiles, e.g. 10,50,90"),
+    limit: int = Query(10, ge=1, le=100, description="Number of worst offenders"),
+    db: Session = Depends(get_db)
+):
+    """Get PPE compliance per item overall, per department and per period, and the worst offenders.
+
+    Requires the optional numpy package.
+    """
+    points = DEFAULT_PERCENTILES
+    if percentiles:
+        try:
+            points = tuple(float(point) for point in percentiles.split(",") if point.strip())
+        except ValueError:
+            points = ()
+        if not points or any(not 0 <= point <= 100 for point in points):
+            raise HTTPException(status_code=400, detail="percentiles must be numbers between 0 and 100")
+    return json_response(
+        get_ppe_compliance_analytics(db, period, date_from, date_to, department, points, limit),
+        response
+    )
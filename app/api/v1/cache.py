@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from app.services.entity_cache import cache_stats
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+@router.get("/stats")
+def get_cache_stats():
+    """Get hit/miss statistics for each in-process entity cache"""
+    return cache_stats()
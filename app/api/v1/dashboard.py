@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.services.dashboard_service import get_dashboard_summary
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+@router.get("/summary")
+def get_summary(db: Session = Depends(get_db)):
+    """Get incident, training, inspection and PPE totals for the dashboard"""
+    return get_dashboard_summary(db)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.employee_service import (
@@ -6,33 +6,63 @@ from app.services.employee_service import (
     get_employee_by_id,
     create_employee,
     update_employee,
-    delete_employee
+    delete_employee,
+    count_employees,
+    parse_employee_fields,
+    update_employees,
+    delete_employees
 )
-from app.schemas import EmployeeCreate, EmployeeUpdate
-from typing import List
+from app.services.pagination import decode_cursor, set_page_headers
+from app.services.serializers import json_response
+from app.schemas import EmployeeCreate, EmployeeUpdate, EmployeeBatchUpdate, BatchDelete
+from typing import List, Optional
 
 router = APIRouter(prefix="/employees", tags=["employees"])
 
 @router.get("/")
-async def get_employee_list(db: Session = Depends(get_db)):
-    """Get all employees"""
-    return get_employees(db)
+def get_employee_list(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    all_employees: bool = Query(False, alias="all", description="Return every employee in one response, ignoring limit"),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    department: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. employee_id,name"),
+    db: Session = Depends(get_db)
+):
+    """Get employees with paging, department filter and field projection; all=true returns every employee"""
+    if all_employees:
+        limit = None
+    employees = get_employees(
+        db,
+        skip=skip,
+        limit=limit,
+        after_id=decode_cursor(cursor),
+        department=department,
+        fields=parse_employee_fields(fields)
+    )
+    set_page_headers(response, employees, limit, lambda employee: employee["employee_id"], count_employees(db, department))
+    return json_response(employees, response)
 
 @router.get("/{employee_id}")
-async def get_employee(employee_id: int, db: Session = Depends(get_db)):
+def get_employee(
+    employee_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. employee_id,name"),
+    db: Session = Depends(get_db)
+):
     """Get a specific employee by ID"""
-    employee = get_employee_by_id(db, employee_id)
+    employee = get_employee_by_id(db, employee_id, fields=parse_employee_fields(fields))
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
-    return employee
+    return json_response(employee)
 
 @router.post("/")
-async def create_employee_record(employee_data: EmployeeCreate, db: Session = Depends(get_db)):
+def create_employee_record(employee_data: EmployeeCreate, db: Session = Depends(get_db)):
     """Create a new employee"""
     return create_employee(db, employee_data)
 
 @router.put("/{employee_id}")
-async def update_employee_record(
+def update_employee_record(
     employee_id: int, 
     employee_data: EmployeeUpdate, 
     db: Session = Depends(get_db)
@@ -41,9 +71,19 @@ async def update_employee_record(
     return update_employee(db, employee_id, employee_data)
 
 @router.delete("/{employee_id}")
-async def delete_employee_record(employee_id: int, db: Session = Depends(get_db)):
+def delete_employee_record(employee_id: int, db: Session = Depends(get_db)):
     """Delete an employee"""
     success = delete_employee(db, employee_id)
     if not success:
         raise HTTPException(status_code=404, detail="Employee not found")
     return {"message": "Employee deleted successfully"}
+
+@router.patch("/")
+def update_employees_batch(batch: EmployeeBatchUpdate, db: Session = Depends(get_db)):
+    """Apply the same changes to many employees in one UPDATE"""
+    return update_employees(db, batch.ids, batch.changes)
+
+@router.delete("/")
+def delete_employees_batch(batch: BatchDelete, db: Session = Depends(get_db)):
+    """Delete many employees in one DELETE"""
+    return delete_employees(db, batch.ids)
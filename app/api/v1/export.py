@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.services.columnar import columnar_format
+from app.services.export_service import export_rows, EXPORT_EXTENSIONS, EXPORT_MEDIA_TYPES
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+@router.get("/{entity}")
+def export_entity(
+    entity: str,
+    request: Request,
+    file_format: Optional[str] = Query(
+        None, alias="format",
+        description="csv, ndjson, arrow or msgpack; defaults to the Accept header, then csv"
+    ),
+    db: Session = Depends(get_db)
+):
+    """Stream every row of incidents, inspections, trainings, ppe_compliance or employees"""
+    file_format = file_format or columnar_format(request) or "csv"
+    rows = export_rows(db, entity, file_format)
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{EXPORT_EXTENSIONS[file_format]}"'}
+    )
@@ -1,13 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import io
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from ...database import get_db
 from ...schemas import (
     SafetyIncidentCreate, 
     SafetyIncidentUpdate, 
-    SafetyIncidentResponse
+    SafetyIncidentResponse,
+    SafetyIncidentFilter,
+    SafetyIncidentBatchUpdate,
+    BatchDelete
 )
-from ...services.incident_service import SafetyIncidentService
+from ...services.incident_service import (
+    SafetyIncidentService,
+    IMPORT_FORMATS,
+    INCIDENT_SORT_PATTERN,
+    incident_cursor_key,
+    incident_cursor_parsers,
+    incident_fields
+)
+from ...services.columnar import columnar_response, negotiate_format
+from ...services.counters import get_count
+from ...services.pagination import decode_key_cursor, set_page_headers
+from ...services.serializers import json_response
+from ...services.versions import conditional_get
 
 router = APIRouter(prefix="/incidents", tags=["incidents"])
 
@@ -20,24 +37,88 @@ def create_incident(
     service = SafetyIncidentService(db)
     return service.create_incident(incident_data)
 
-@router.get("/", response_model=List[SafetyIncidentResponse])
+@router.post("/import")
+def import_incidents(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(None, alias="format", description="csv or jsonl; defaults to the file extension"),
+    db: Session = Depends(get_db)
+):
+    """Bulk import safety incidents from a CSV or JSONL upload."""
+    if file_format is None:
+        extension = (file.filename or "").rsplit(".", 1)[-1].lower()
+        file_format = "jsonl" if extension == "ndjson" else extension
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Upload a .csv or .jsonl file or pass format=csv|jsonl")
+
+    service = SafetyIncidentService(db)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return service.import_incidents(stream, file_format)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import file must be UTF-8 encoded")
+    finally:
+        stream.detach()
+
+@router.get("/", response_model=List[SafetyIncidentResponse], dependencies=[Depends(conditional_get("safety_incidents"))])
 def list_incidents(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    status: Optional[List[str]] = Query(None),
+    location_id: Optional[List[int]] = Query(None),
+    injury_severity: Optional[List[str]] = Query(None),
+    incident_type: Optional[List[str]] = Query(None),
+    date_from: Optional[datetime] = Query(None, description="Earliest date_time, inclusive"),
+    date_to: Optional[datetime] = Query(None, description="Latest date_time, exclusive"),
+    sort: str = Query("incident_id", pattern=INCIDENT_SORT_PATTERN, description="incident_id or date_time, prefix - for descending"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. incident_id,date_time,status"),
     db: Session = Depends(get_db)
 ):
-    """Get all safety incidents with pagination."""
+    """Get safety incidents filtered and sorted in SQL, with offset or cursor pagination.
+
+    Repeat a filter parameter to match any of several values, e.g. ?status=Open&status=Under Investigation.
+    Pass fields= to select and return only some columns, and send
+    Accept: application/vnd.apache.arrow.stream or application/msgpack for a columnar page.
+    """
+    filters = SafetyIncidentFilter(
+        status=status,
+        location_id=location_id,
+        injury_severity=injury_severity,
+        incident_type=incident_type,
+        date_from=date_from,
+        date_to=date_to
+    )
+    serializer = incident_fields.serializer(incident_fields.parse(fields))
     service = SafetyIncidentService(db)
-    return service.get_incidents(skip=skip, limit=limit)
+    incidents = service.get_incidents(
+        skip=skip,
+        limit=limit,
+        after=decode_key_cursor(cursor, incident_cursor_parsers(sort)),
+        filters=filters,
+        sort=sort,
+        columns=serializer.columns
+    )
+    # The maintained counter only covers the unfiltered table
+    is_filtered = any(value is not None for value in filters.model_dump().values())
+    total = service.count_incidents(filters) if is_filtered else get_count(db, "incidents")
+    set_page_headers(response, incidents, limit, lambda incident: incident_cursor_key(incident, sort), total)
+    file_format = negotiate_format(request, response)
+    if file_format:
+        return columnar_response(file_format, serializer.to_columns(incidents), response)
+    return json_response(serializer.to_list(incidents), response)
 
-@router.get("/{incident_id}", response_model=SafetyIncidentResponse)
+@router.get("/{incident_id}", response_model=SafetyIncidentResponse, dependencies=[Depends(conditional_get("safety_incidents"))])
 def get_incident(
     incident_id: int,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. incident_id,date_time,status"),
     db: Session = Depends(get_db)
 ):
     """Get a specific safety incident by ID."""
     service = SafetyIncidentService(db)
-    return service.get_incident(incident_id)
+    return json_response(service.get_incident_data(incident_id, incident_fields.parse(fields)), response)
 
 @router.put("/{incident_id}", response_model=SafetyIncidentResponse)
 def update_incident(
@@ -58,3 +139,21 @@ def delete_incident(
     service = SafetyIncidentService(db)
     service.delete_incident(incident_id)
     return {"message": "Incident deleted successfully"}
+
+@router.patch("/")
+def update_incidents(
+    batch: SafetyIncidentBatchUpdate,
+    db: Session = Depends(get_db)
+):
+    """Apply the same changes to many safety incidents in one UPDATE."""
+    service = SafetyIncidentService(db)
+    return service.update_incidents(batch.ids, batch.changes)
+
+@router.delete("/")
+def delete_incidents(
+    batch: BatchDelete,
+    db: Session = Depends(get_db)
+):
+    """Delete many safety incidents in one DELETE."""
+    service = SafetyIncidentService(db)
+    return service.delete_incidents(batch.ids)
@@ -1,42 +1,142 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.inspection_service import (
     get_inspections,
+    get_inspection_columns,
+    inspection_fields,
     get_inspection_by_id,
     create_inspection,
     update_inspection,
-    delete_inspection
+    delete_inspection,
+    update_inspections,
+    delete_inspections
 )
-from app.schemas import SafetyInspectionCreate, SafetyInspectionUpdate
-from typing import List
+from app.services.inspection_schedule_service import (
+    GENERATE_MAX_DAYS,
+    get_schedules,
+    get_schedule_by_id,
+    create_schedule,
+    update_schedule,
+    delete_schedule,
+    generate_inspections
+)
+from app.services.columnar import columnar_response, negotiate_format
+from app.services.counters import get_count
+from app.services.pagination import decode_cursor, set_page_headers
+from app.services.serializers import json_response
+from app.services.versions import conditional_get
+from app.schemas import (
+    SafetyInspectionCreate,
+    SafetyInspectionUpdate,
+    SafetyInspectionBatchUpdate,
+    BatchDelete,
+    InspectionScheduleCreate,
+    InspectionScheduleUpdate
+)
+from datetime import date
+from typing import List, Optional
 
 router = APIRouter(prefix="/inspections", tags=["inspections"])
 
-@router.get("/")
-async def get_inspection_list(
+@router.get("/", dependencies=[Depends(conditional_get("safety_inspections", "locations"))])
+def get_inspection_list(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. inspection_id,type,status,scheduled_date"),
+    db: Session = Depends(get_db)
+):
+    """Get all inspections with offset or cursor pagination and optional field projection.
+
+    Send Accept: application/vnd.apache.arrow.stream or application/msgpack for a columnar page.
+    """
+    after_id = decode_cursor(cursor)
+    fields = inspection_fields.parse(fields)
+    total = get_count(db, "inspections")
+    file_format = negotiate_format(request, response)
+    if file_format:
+        columns = get_inspection_columns(db, skip, limit, after_id=after_id, fields=fields)
+        set_page_headers(response, columns["inspection_id"], limit, lambda inspection_id: inspection_id, total)
+        return columnar_response(file_format, columns, response)
+
+    inspections = get_inspections(db, skip, limit, after_id=after_id, fields=fields)
+    set_page_headers(response, inspections, limit, lambda inspection: inspection["inspection_id"], total)
+    return json_response(inspections, response)
+
+@router.get("/schedules", dependencies=[Depends(conditional_get("inspection_schedules"))])
+def get_inspection_schedules(
+    response: Response,
+    location_id: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Get the recurring inspection schedules"""
+    return json_response(get_schedules(db, location_id), response)
+
+@router.post("/schedules")
+def create_inspection_schedule(schedule_data: InspectionScheduleCreate, db: Session = Depends(get_db)):
+    """Create a daily, weekly or monthly inspection schedule; without location_id it covers every location"""
+    return create_schedule(db, schedule_data)
+
+@router.post("/schedules/generate")
+def generate_upcoming_inspections(
+    date_from: Optional[date] = Query(None, description="First day to plan; defaults to today"),
+    days: int = Query(365, ge=1, le=GENERATE_MAX_DAYS, description="Number of days to plan"),
+    schedule_id: Optional[List[int]] = Query(None, description="Only these schedules; defaults to all"),
     db: Session = Depends(get_db)
 ):
-    """Get all inspections with pagination"""
-    return get_inspections(db, skip, limit)
+    """Create the upcoming inspections of the schedules in one INSERT ... SELECT.
 
-@router.get("/{inspection_id}")
-async def get_inspection(inspection_id: int, db: Session = Depends(get_db)):
+    Inspections already generated for a schedule, location and day are skipped, so re-running is safe.
+    """
+    return generate_inspections(db, date_from, days, schedule_id)
+
+@router.get("/schedules/{schedule_id}", dependencies=[Depends(conditional_get("inspection_schedules"))])
+def get_inspection_schedule(schedule_id: int, response: Response, db: Session = Depends(get_db)):
+    """Get a specific inspection schedule by ID"""
+    schedule = get_schedule_by_id(db, schedule_id)
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Inspection schedule not found")
+    return json_response(schedule, response)
+
+@router.put("/schedules/{schedule_id}")
+def update_inspection_schedule(
+    schedule_id: int,
+    schedule_data: InspectionScheduleUpdate,
+    db: Session = Depends(get_db)
+):
+    """Update an inspection schedule; already generated inspections are not moved"""
+    return update_schedule(db, schedule_id, schedule_data)
+
+@router.delete("/schedules/{schedule_id}")
+def delete_inspection_schedule(schedule_id: int, db: Session = Depends(get_db)):
+    """Delete an inspection schedule; already generated inspections are kept"""
+    if not delete_schedule(db, schedule_id):
+        raise HTTPException(status_code=404, detail="Inspection schedule not found")
+    return {"message": "Inspection schedule deleted successfully"}
+
+@router.get("/{inspection_id}", dependencies=[Depends(conditional_get("safety_inspections", "locations"))])
+def get_inspection(
+    inspection_id: int,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. inspection_id,type,status,scheduled_date"),
+    db: Session = Depends(get_db)
+):
     """Get a specific inspection by ID"""
-    inspection = get_inspection_by_id(db, inspection_id)
+    inspection = get_inspection_by_id(db, inspection_id, fields=inspection_fields.parse(fields))
     if not inspection:
         raise HTTPException(status_code=404, detail="Inspection not found")
-    return inspection
+    return json_response(inspection, response)
 
 @router.post("/")
-async def create_inspection_record(inspection_data: SafetyInspectionCreate, db: Session = Depends(get_db)):
+def create_inspection_record(inspection_data: SafetyInspectionCreate, db: Session = Depends(get_db)):
     """Create a new inspection"""
     return create_inspection(db, inspection_data)
 
 @router.put("/{inspection_id}")
-async def update_inspection_record(
+def update_inspection_record(
     inspection_id: int, 
     inspection_data: SafetyInspectionUpdate, 
     db: Session = Depends(get_db)
@@ -45,9 +145,19 @@ async def update_inspection_record(
     return update_inspection(db, inspection_id, inspection_data)
 
 @router.delete("/{inspection_id}")
-async def delete_inspection_record(inspection_id: int, db: Session = Depends(get_db)):
+def delete_inspection_record(inspection_id: int, db: Session = Depends(get_db)):
     """Delete an inspection"""
     success = delete_inspection(db, inspection_id)
     if not success:
         raise HTTPException(status_code=404, detail="Inspection not found")
     return {"message": "Inspection deleted successfully"}
+
+@router.patch("/")
+def update_inspections_batch(batch: SafetyInspectionBatchUpdate, db: Session = Depends(get_db)):
+    """Apply the same changes to many inspections in one UPDATE"""
+    return update_inspections(db, batch.ids, batch.changes)
+
+@router.delete("/")
+def delete_inspections_batch(batch: BatchDelete, db: Session = Depends(get_db)):
+    """Delete many inspections in one DELETE"""
+    return delete_inspections(db, batch.ids)
@@ -1,38 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.location_service import (
     get_locations,
+    location_fields,
     get_location_by_id,
     create_location,
     update_location,
-    delete_location
+    delete_location,
+    update_locations,
+    delete_locations
 )
-from app.schemas import LocationCreate, LocationUpdate
-from typing import List
+from app.services.serializers import json_response
+from app.schemas import LocationCreate, LocationUpdate, LocationBatchUpdate, BatchDelete
+from typing import List, Optional
 
 router = APIRouter(prefix="/locations", tags=["locations"])
 
 @router.get("/")
-async def get_location_list(db: Session = Depends(get_db)):
+def get_location_list(
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. location_id,name"),
+    db: Session = Depends(get_db)
+):
     """Get all locations"""
-    return get_locations(db)
+    return json_response(get_locations(db, fields=location_fields.parse(fields)))
 
 @router.get("/{location_id}")
-async def get_location(location_id: int, db: Session = Depends(get_db)):
+def get_location(
+    location_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. location_id,name"),
+    db: Session = Depends(get_db)
+):
     """Get a specific location by ID"""
-    location = get_location_by_id(db, location_id)
+    location = get_location_by_id(db, location_id, fields=location_fields.parse(fields))
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
-    return location
+    return json_response(location)
 
 @router.post("/")
-async def create_location_record(location_data: LocationCreate, db: Session = Depends(get_db)):
+def create_location_record(location_data: LocationCreate, db: Session = Depends(get_db)):
     """Create a new location"""
     return create_location(db, location_data)
 
 @router.put("/{location_id}")
-async def update_location_record(
+def update_location_record(
     location_id: int, 
     location_data: LocationUpdate, 
     db: Session = Depends(get_db)
@@ -41,9 +52,19 @@ async def update_location_record(
     return update_location(db, location_id, location_data)
 
 @router.delete("/{location_id}")
-async def delete_location_record(location_id: int, db: Session = Depends(get_db)):
+def delete_location_record(location_id: int, db: Session = Depends(get_db)):
     """Delete a location"""
     success = delete_location(db, location_id)
     if not success:
         raise HTTPException(status_code=404, detail="Location not found")
     return {"message": "Location deleted successfully"}
+
+@router.patch("/")
+def update_locations_batch(batch: LocationBatchUpdate, db: Session = Depends(get_db)):
+    """Apply the same changes to many locations in one UPDATE"""
+    return update_locations(db, batch.ids, batch.changes)
+
+@router.delete("/")
+def delete_locations_batch(batch: BatchDelete, db: Session = Depends(get_db)):
+    """Delete many locations in one DELETE"""
+    return delete_locations(db, batch.ids)
@@ -1,42 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.ppe_compliance_service import (
     get_ppe_compliance_records,
+    get_ppe_compliance_columns,
+    ppe_compliance_fields,
     get_ppe_compliance_by_id,
     create_ppe_compliance,
     update_ppe_compliance,
-    delete_ppe_compliance
+    delete_ppe_compliance,
+    update_ppe_compliance_records,
+    delete_ppe_compliance_records
 )
-from app.schemas import PPEComplianceCreate, PPEComplianceUpdate
-from typing import List
+from app.services.columnar import columnar_response, negotiate_format
+from app.services.counters import get_count
+from app.services.pagination import decode_cursor, set_page_headers
+from app.services.serializers import json_response
+from app.services.versions import conditional_get
+from app.schemas import PPEComplianceCreate, PPEComplianceUpdate, PPEComplianceBatchUpdate, BatchDelete
+from typing import List, Optional
 
 router = APIRouter(prefix="/ppe-compliance", tags=["ppe-compliance"])
 
-@router.get("/")
-async def get_ppe_compliance_list(
+@router.get("/", dependencies=[Depends(conditional_get("ppe_compliance", "employees"))])
+def get_ppe_compliance_list(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. ppe_id,status,violations"),
     db: Session = Depends(get_db)
 ):
-    """Get all PPE compliance records with pagination"""
-    return get_ppe_compliance_records(db, skip, limit)
+    """Get all PPE compliance records with offset or cursor pagination and optional field projection.
 
-@router.get("/{ppe_id}")
-async def get_ppe_compliance_record(ppe_id: int, db: Session = Depends(get_db)):
+    Send Accept: application/vnd.apache.arrow.stream or application/msgpack for a columnar page.
+    """
+    after_id = decode_cursor(cursor)
+    fields = ppe_compliance_fields.parse(fields)
+    total = get_count(db, "ppe_compliance")
+    file_format = negotiate_format(request, response)
+    if file_format:
+        columns = get_ppe_compliance_columns(db, skip, limit, after_id=after_id, fields=fields)
+        set_page_headers(response, columns["ppe_id"], limit, lambda ppe_id: ppe_id, total)
+        return columnar_response(file_format, columns, response)
+
+    records = get_ppe_compliance_records(db, skip, limit, after_id=after_id, fields=fields)
+    set_page_headers(response, records, limit, lambda record: record["ppe_id"], total)
+    return json_response(records, response)
+
+@router.get("/{ppe_id}", dependencies=[Depends(conditional_get("ppe_compliance", "employees"))])
+def get_ppe_compliance_record(
+    ppe_id: int,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. ppe_id,status,violations"),
+    db: Session = Depends(get_db)
+):
     """Get a specific PPE compliance record by ID"""
-    record = get_ppe_compliance_by_id(db, ppe_id)
+    record = get_ppe_compliance_by_id(db, ppe_id, fields=ppe_compliance_fields.parse(fields))
     if not record:
         raise HTTPException(status_code=404, detail="PPE compliance record not found")
-    return record
+    return json_response(record, response)
 
 @router.post("/")
-async def create_ppe_compliance_record(ppe_data: PPEComplianceCreate, db: Session = Depends(get_db)):
+def create_ppe_compliance_record(ppe_data: PPEComplianceCreate, db: Session = Depends(get_db)):
     """Create a new PPE compliance record"""
     return create_ppe_compliance(db, ppe_data)
 
 @router.put("/{ppe_id}")
-async def update_ppe_compliance_record(
+def update_ppe_compliance_record(
     ppe_id: int, 
     ppe_data: PPEComplianceUpdate, 
     db: Session = Depends(get_db)
@@ -45,9 +77,19 @@ async def update_ppe_compliance_record(
     return update_ppe_compliance(db, ppe_id, ppe_data)
 
 @router.delete("/{ppe_id}")
-async def delete_ppe_compliance_record(ppe_id: int, db: Session = Depends(get_db)):
+def delete_ppe_compliance_record(ppe_id: int, db: Session = Depends(get_db)):
     """Delete a PPE compliance record"""
     success = delete_ppe_compliance(db, ppe_id)
     if not success:
         raise HTTPException(status_code=404, detail="PPE compliance record not found")
     return {"message": "PPE compliance record deleted successfully"}
+
+@router.patch("/")
+def update_ppe_compliance_batch(batch: PPEComplianceBatchUpdate, db: Session = Depends(get_db)):
+    """Apply the same changes to many PPE compliance records in one UPDATE"""
+    return update_ppe_compliance_records(db, batch.ids, batch.changes)
+
+@router.delete("/")
+def delete_ppe_compliance_batch(batch: BatchDelete, db: Session = Depends(get_db)):
+    """Delete many PPE compliance records in one DELETE"""
+    return delete_ppe_compliance_records(db, batch.ids)
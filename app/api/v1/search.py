@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.services.search_service import search
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("/")
+def search_records(
+    q: str = Query(..., min_length=1, description="Words to search for; end a word with * to match prefixes"),
+    entity_type: Optional[List[str]] = Query(None, alias="type", description="incident and/or inspection"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over incident descriptions and inspection notes, best matches first"""
+    return search(db, q, entity_type, skip, limit)
@@ -1,41 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ...database import get_db
 from ...schemas import (
     SafetyTrainingCreate, 
     SafetyTrainingUpdate, 
-    SafetyTrainingResponse
+    SafetyTrainingResponse,
+    SafetyTrainingBatchUpdate,
+    TrainingEnrollment,
+    BatchDelete
 )
 from ...services.training_service import (
     get_trainings,
+    training_fields,
     get_training_by_id,
     create_training,
     update_training,
-    delete_training
+    delete_training,
+    enroll_participants,
+    unenroll_participants,
+    update_trainings,
+    delete_trainings
 )
+from ...services.training_expiries import (
+    EXPIRY_CURSOR_PARSERS,
+    count_expiring_trainings,
+    expiry_cursor_key,
+    get_expiring_trainings
+)
+from ...services.counters import get_count
+from ...services.pagination import decode_cursor, decode_key_cursor, set_page_headers
+from ...services.serializers import json_response
+from ...services.versions import conditional_get
 
 router = APIRouter(prefix="/training", tags=["training"])
 
-@router.get("/")
-async def get_training_sessions(
+@router.get("/", dependencies=[Depends(conditional_get("safety_trainings", "training_participants"))])
+def get_training_sessions(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. training_id,training_type,expiry_date"),
+    db: Session = Depends(get_db)
+):
+    """Get all training sessions with offset or cursor pagination and optional field projection"""
+    trainings = get_trainings(db, skip, limit, after_id=decode_cursor(cursor), fields=training_fields.parse(fields))
+    set_page_headers(response, trainings, limit, lambda training: training["training_id"], get_count(db, "trainings"))
+    return json_response(trainings, response)
+
+@router.get("/expiring")
+def get_expiring_training(
+    response: Response,
+    days: int = Query(30, ge=0, le=3650, description="Expiring within this many days from today"),
+    include_expired: bool = Query(False, description="Also list trainings that have already expired"),
+    department: Optional[List[str]] = Query(None),
+    training_type: Optional[List[str]] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
-    """Get all training sessions with pagination"""
-    return get_trainings(db, skip, limit)
+    """Get employees whose latest training of each type expires soon, soonest first.
+
+    Reads the per-employee expiry table that training writes keep current.
+    """
+    after = decode_key_cursor(cursor, EXPIRY_CURSOR_PARSERS)
+    expiries = get_expiring_trainings(db, days, include_expired, department, training_type, skip, limit, after)
+    total = count_expiring_trainings(db, days, include_expired, department, training_type)
+    set_page_headers(response, expiries, limit, expiry_cursor_key, total)
+    return json_response(expiries, response)
 
-@router.get("/{training_id}")
-async def get_training_session(training_id: int, db: Session = Depends(get_db)):
+@router.get("/{training_id}", dependencies=[Depends(conditional_get("safety_trainings", "training_participants"))])
+def get_training_session(
+    training_id: int,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. training_id,training_type,expiry_date"),
+    db: Session = Depends(get_db)
+):
     """Get a specific training session by ID"""
-    training = get_training_by_id(db, training_id)
+    training = get_training_by_id(db, training_id, fields=training_fields.parse(fields))
     if not training:
         raise HTTPException(status_code=404, detail="Training session not found")
-    return training
+    return json_response(training, response)
 
 @router.post("/", status_code=201)
-async def create_training_session(
+def create_training_session(
     training_data: SafetyTrainingCreate, 
     db: Session = Depends(get_db)
 ):
@@ -43,7 +93,7 @@ async def create_training_session(
     return create_training(db, training_data)
 
 @router.put("/{training_id}")
-async def update_training_session(
+def update_training_session(
     training_id: int, 
     training_data: SafetyTrainingUpdate, 
     db: Session = Depends(get_db)
@@ -51,10 +101,38 @@ async def update_training_session(
     """Update an existing training session"""
     return update_training(db, training_id, training_data)
 
+@router.post("/{training_id}/participants")
+def enroll_training_participants(
+    training_id: int,
+    enrollment: TrainingEnrollment,
+    db: Session = Depends(get_db)
+):
+    """Enrol employees in a training session in one request"""
+    return enroll_participants(db, training_id, enrollment.employee_ids)
+
+@router.delete("/{training_id}/participants")
+def unenroll_training_participants(
+    training_id: int,
+    enrollment: TrainingEnrollment,
+    db: Session = Depends(get_db)
+):
+    """Remove employees from a training session in one request"""
+    return unenroll_participants(db, training_id, enrollment.employee_ids)
+
 @router.delete("/{training_id}")
-async def delete_training_session(training_id: int, db: Session = Depends(get_db)):
+def delete_training_session(training_id: int, db: Session = Depends(get_db)):
     """Delete a training session"""
     success = delete_training(db, training_id)
     if not success:
         raise HTTPException(status_code=404, detail="Training session not found")
     return {"message": "Training session deleted successfully"}
+
+@router.patch("/")
+def update_training_sessions(batch: SafetyTrainingBatchUpdate, db: Session = Depends(get_db)):
+    """Apply the same changes to many training sessions in one UPDATE"""
+    return update_trainings(db, batch.ids, batch.changes)
+
+@router.delete("/")
+def delete_training_sessions(batch: BatchDelete, db: Session = Depends(get_db)):
+    """Delete many training sessions, with their participants, in one DELETE"""
+    return delete_trainings(db, batch.ids)
@@ -6,5 +6,28 @@ class Settings:
         self.secret_key = os.getenv("SECRET_KEY", "your-secret-key-here")
         self.algorithm = "HS256"
         self.access_token_expire_minutes = 30
+        # Size of the threadpool that runs the synchronous database routes
+        self.worker_threads = int(os.getenv("WORKER_THREADS", "40"))
+        
+        # In-process entity cache (per namespace)
+        self.cache_max_entries = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+        self.cache_ttl_seconds = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+        
+        # Connection pool sizing
+        self.db_pool_size = int(os.getenv("DB_POOL_SIZE", "20"))
+        self.db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+        self.db_pool_timeout = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+        
+        # SQLite storage profile: "concurrent" applies the pragmas below on every
+        # connection, "default" leaves SQLite's rollback journal settings alone
+        self.sqlite_profile = os.getenv("SQLITE_PROFILE", "concurrent")
+        self.sqlite_pragmas = {
+            "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+            "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+            "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+            "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),  # negative means KiB
+            "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),  # milliseconds
+            "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+        }
 
 settings = Settings()
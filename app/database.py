@@ -1,12 +1,44 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
+is_sqlite = settings.database_url.startswith("sqlite")
+is_sqlite_memory = is_sqlite and settings.database_url in ("sqlite://", "sqlite:///:memory:")
+
+engine_options = {}
+if not is_sqlite_memory:
+    # In-memory SQLite uses a single shared connection and takes no pool sizing
+    engine_options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=not is_sqlite
+    )
+
 engine = create_engine(
     settings.database_url, 
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+    connect_args={"check_same_thread": False} if is_sqlite else {},
+    **engine_options
 )
+
+if is_sqlite:
+    @event.listens_for(engine, "connect")
+    def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        """SQLite only enforces foreign keys, and ON DELETE CASCADE, when asked to per connection"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+if is_sqlite and settings.sqlite_profile == "concurrent":
+    @event.listens_for(engine, "connect")
+    def apply_sqlite_pragmas(dbapi_connection, connection_record):
+        """Apply the concurrent storage profile (WAL, relaxed fsync, larger caches)"""
+        cursor = dbapi_connection.cursor()
+        for pragma, value in settings.sqlite_pragmas.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, Time, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Time, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
+from .search import register_fts
 
 class Location(Base):
     __tablename__ = "locations"
@@ -24,8 +25,17 @@ class Employee(Base):
     department = Column(String(100))
     
     # Relationships
-    training_participants = relationship("TrainingParticipant", back_populates="employee")
-    ppe_compliance = relationship("PPECompliance", back_populates="employee")
+    # Child rows are removed by ON DELETE CASCADE rather than loaded and deleted
+    training_participants = relationship(
+        "TrainingParticipant", back_populates="employee", cascade="all, delete-orphan", passive_deletes=True
+    )
+    ppe_compliance = relationship(
+        "PPECompliance", back_populates="employee", cascade="all, delete-orphan", passive_deletes=True
+    )
+    
+    __table_args__ = (
+        Index("ix_employees_department", "department"),
+    )
 
 class SafetyIncident(Base):
     __tablename__ = "safety_incidents"
@@ -43,6 +53,12 @@ class SafetyIncident(Base):
     
     # Relationships
     location = relationship("Location", back_populates="incidents")
+    
+    __table_args__ = (
+        Index("ix_safety_incidents_date_time", "date_time"),
+        Index("ix_safety_incidents_location_id_date_time", "location_id", "date_time"),
+        Index("ix_safety_incidents_status_date_time", "status", "date_time"),
+    )
 
 class SafetyTraining(Base):
     __tablename__ = "safety_trainings"
@@ -55,18 +71,25 @@ class SafetyTraining(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    participants = relationship("TrainingParticipant", back_populates="training")
+    participants = relationship(
+        "TrainingParticipant", back_populates="training", cascade="all, delete-orphan", passive_deletes=True
+    )
 
 class TrainingParticipant(Base):
     __tablename__ = "training_participants"
     
     id = Column(Integer, primary_key=True, index=True)
-    training_id = Column(Integer, ForeignKey("safety_trainings.training_id"), nullable=False)
-    employee_id = Column(Integer, ForeignKey("employees.employee_id"), nullable=False)
+    training_id = Column(Integer, ForeignKey("safety_trainings.training_id", ondelete="CASCADE"), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.employee_id", ondelete="CASCADE"), nullable=False)
     
     # Relationships
     training = relationship("SafetyTraining", back_populates="participants")
     employee = relationship("Employee", back_populates="training_participants")
+    
+    __table_args__ = (
+        Index("uq_training_participants_training_id_employee_id", "training_id", "employee_id", unique=True),
+        Index("ix_training_participants_employee_id", "employee_id"),
+    )
 
 class SafetyInspection(Base):
     __tablename__ = "safety_inspections"
@@ -81,15 +104,28 @@ class SafetyInspection(Base):
     status = Column(String(50), default="Scheduled")
     score = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Schedule the inspection was generated from, if any. No foreign key: the
+    # inspection stays when its schedule is deleted, and schedule ids are never reused.
+    schedule_id = Column(Integer)
     
     # Relationships
     location = relationship("Location", back_populates="inspections")
+    
+    __table_args__ = (
+        Index("ix_safety_inspections_inspection_date", "inspection_date"),
+        Index("ix_safety_inspections_location_id_inspection_date", "location_id", "inspection_date"),
+        # One generated inspection per schedule, location and day; manual inspections have no schedule_id
+        Index(
+            "ix_safety_inspections_schedule_id_location_id_inspection_date",
+            "schedule_id", "location_id", "inspection_date", unique=True
+        ),
+    )
 
 class PPECompliance(Base):
     __tablename__ = "ppe_compliance"
     
     ppe_id = Column(Integer, primary_key=True, index=True)
-    employee_id = Column(Integer, ForeignKey("employees.employee_id"), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.employee_id", ondelete="CASCADE"), nullable=False)
     assessment_date = Column(Date)
     helmet_compliance = Column(Integer)
     safety_glasses_compliance = Column(Integer)
@@ -103,3 +139,68 @@ class PPECompliance(Base):
     
     # Relationships
     employee = relationship("Employee", back_populates="ppe_compliance")
+    
+    __table_args__ = (
+        Index("ix_ppe_compliance_employee_id_assessment_date", "employee_id", "assessment_date"),
+    )
+
+class EntityCounter(Base):
+    __tablename__ = "entity_counters"
+    
+    name = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class IncidentRollup(Base):
+    __tablename__ = "incident_rollups"
+    
+    # Incident counts per day/week/month bucket, location and injury severity,
+    # maintained by the incident write paths (see services/incident_rollups.py).
+    # No foreign key to locations: empty buckets may outlive their location.
+    period = Column(String(10), primary_key=True)
+    bucket = Column(Date, primary_key=True)
+    location_id = Column(Integer, primary_key=True)
+    injury_severity = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class EmployeeTrainingExpiry(Base):
+    __tablename__ = "employee_training_expiries"
+    
+    # Latest expiry_date per employee and training type over the trainings they
+    # took, refreshed by the training write paths (see services/training_expiries.py).
+    # training_id is the training that expiry comes from.
+    employee_id = Column(Integer, ForeignKey("employees.employee_id", ondelete="CASCADE"), primary_key=True)
+    training_type = Column(String(100), primary_key=True)
+    expiry_date = Column(Date, nullable=False)
+    training_id = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_employee_training_expiries_expiry_date", "expiry_date", "employee_id", "training_type"),
+        Index("ix_employee_training_expiries_training_type_expiry_date", "training_type", "expiry_date"),
+    )
+
+class InspectionSchedule(Base):
+    __tablename__ = "inspection_schedules"
+    
+    # Recurrence rule that the schedule generator materializes into
+    # safety_inspections rows (see services/inspection_schedule_service.py).
+    # Without a location_id the rule applies to every location.
+    schedule_id = Column(Integer, primary_key=True)
+    location_id = Column(Integer, ForeignKey("locations.location_id", ondelete="CASCADE"))
+    inspection_type = Column(String(100), nullable=False)
+    frequency = Column(String(10), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date)
+    inspection_time = Column(Time)
+    inspector_name = Column(String(100))
+    notes = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_inspection_schedules_location_id", "location_id"),
+        # AUTOINCREMENT keeps a deleted schedule's id from matching its inspections again
+        {"sqlite_autoincrement": True},
+    )
+
+register_fts(SafetyIncident.__table__)
+register_fts(SafetyInspection.__table__)
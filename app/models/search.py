@@ -0,0 +1,40 @@
+from sqlalchemy import DDL, event
+
+# FTS5 indexes over the free-text columns. Both are external-content tables
+# (the text lives only in the source table) kept in sync by triggers, so
+# every write path, including Core bulk inserts, updates the index.
+FTS_TABLES = {
+    "safety_incidents": {
+        "fts_table": "safety_incidents_fts",
+        "key": "incident_id",
+        "columns": ["incident_type", "description"],
+    },
+    "safety_inspections": {
+        "fts_table": "safety_inspections_fts",
+        "key": "inspection_id",
+        "columns": ["inspection_type", "notes"],
+    },
+}
+
+def fts_statements(table: str) -> list:
+    spec = FTS_TABLES[table]
+    fts, key = spec["fts_table"], spec["key"]
+    columns = ", ".join(spec["columns"])
+    new_values = ", ".join(f"new.{column}" for column in spec["columns"])
+    old_values = ", ".join(f"old.{column}" for column in spec["columns"])
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{columns}, content='{table}', content_rowid='{key}', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.{key}, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.{key}, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.{key}, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.{key}, {new_values}); END",
+    ]
+
+def register_fts(table) -> None:
+    """Create the FTS index and its triggers whenever create_all creates the table on SQLite"""
+    for statement in fts_statements(table.name):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
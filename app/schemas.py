@@ -66,6 +66,14 @@ class SafetyIncidentUpdate(BaseModel):
     reporter_name: Optional[str] = None
     status: Optional[str] = None
 
+class SafetyIncidentFilter(BaseModel):
+    status: Optional[List[str]] = None
+    location_id: Optional[List[int]] = None
+    injury_severity: Optional[List[str]] = None
+    incident_type: Optional[List[str]] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+
 class SafetyIncidentResponse(SafetyIncidentBase):
     model_config = ConfigDict(from_attributes=True)
     incident_id: int
@@ -88,6 +96,9 @@ class SafetyTrainingUpdate(BaseModel):
     expiry_date: Optional[date] = None
     trainer_name: Optional[str] = None
 
+class TrainingEnrollment(BaseModel):
+    employee_ids: List[int] = Field(..., min_length=1)
+
 class SafetyTrainingResponse(SafetyTrainingBase):
     model_config = ConfigDict(from_attributes=True)
     training_id: int
@@ -122,6 +133,39 @@ class SafetyInspectionResponse(SafetyInspectionBase):
     inspection_id: int
     created_at: datetime
 
+# Inspection schedule schemas
+SCHEDULE_FREQUENCY_PATTERN = "^(daily|weekly|monthly)$"
+
+class InspectionScheduleBase(BaseModel):
+    location_id: Optional[int] = None
+    inspection_type: str = Field(..., min_length=1, max_length=100)
+    frequency: str = Field(..., pattern=SCHEDULE_FREQUENCY_PATTERN)
+    interval: int = Field(1, ge=1, le=366)
+    start_date: date
+    end_date: Optional[date] = None
+    inspection_time: Optional[time] = None
+    inspector_name: Optional[str] = None
+    notes: Optional[str] = None
+
+class InspectionScheduleCreate(InspectionScheduleBase):
+    pass
+
+class InspectionScheduleUpdate(BaseModel):
+    location_id: Optional[int] = None
+    inspection_type: Optional[str] = Field(None, min_length=1, max_length=100)
+    frequency: Optional[str] = Field(None, pattern=SCHEDULE_FREQUENCY_PATTERN)
+    interval: Optional[int] = Field(None, ge=1, le=366)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    inspection_time: Optional[time] = None
+    inspector_name: Optional[str] = None
+    notes: Optional[str] = None
+
+class InspectionScheduleResponse(InspectionScheduleBase):
+    model_config = ConfigDict(from_attributes=True)
+    schedule_id: int
+    created_at: datetime
+
 # PPE Compliance schemas
 class PPEComplianceBase(BaseModel):
     employee_id: int
@@ -154,3 +198,33 @@ class PPEComplianceResponse(PPEComplianceBase):
     model_config = ConfigDict(from_attributes=True)
     ppe_id: int
     created_at: datetime
+
+# Batch write schemas
+BATCH_MAX_IDS = 5000
+
+class BatchDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+
+class LocationBatchUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+    changes: LocationUpdate
+
+class EmployeeBatchUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+    changes: EmployeeUpdate
+
+class SafetyIncidentBatchUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+    changes: SafetyIncidentUpdate
+
+class SafetyTrainingBatchUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+    changes: SafetyTrainingUpdate
+
+class SafetyInspectionBatchUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+    changes: SafetyInspectionUpdate
+
+class PPEComplianceBatchUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+    changes: PPEComplianceUpdate
@@ -0,0 +1,125 @@
+import importlib
+from datetime import date, datetime, time
+from fastapi import HTTPException, Request, Response
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+# Columnar formats are optional: pyarrow and msgpack are only imported when a
+# client asks for them, and a missing package answers 406 rather than failing startup
+COLUMNAR_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "msgpack": "application/msgpack",
+}
+COLUMNAR_PACKAGES = {
+    "arrow": "pyarrow",
+    "msgpack": "msgpack",
+}
+_ACCEPTED_TYPES = {
+    "application/vnd.apache.arrow.stream": "arrow",
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/json": None,
+}
+
+# End-of-stream marker of the Arrow IPC streaming format
+_ARROW_END_OF_STREAM = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+
+def _import(file_format: str):
+    package = COLUMNAR_PACKAGES[file_format]
+    try:
+        return importlib.import_module(package)
+    except ImportError:
+        raise HTTPException(
+            status_code=406,
+            detail=f"{COLUMNAR_MEDIA_TYPES[file_format]} responses require the optional {package} package"
+        )
+
+def columnar_format(request: Request) -> Optional[str]:
+    """The columnar format the Accept header prefers over JSON, or None for JSON"""
+    best, best_quality = None, 0.0
+    for media_range in request.headers.get("accept", "").split(","):
+        media_type, *parameters = (part.strip() for part in media_range.split(";"))
+        if media_type.lower() not in _ACCEPTED_TYPES:
+            continue
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > best_quality:
+            best, best_quality = _ACCEPTED_TYPES[media_type.lower()], quality
+    return best
+
+def negotiate_format(request: Request, response: Response) -> Optional[str]:
+    """columnar_format for an endpoint that serves several formats; marks the response as varying by Accept"""
+    response.headers["Vary"] = "Accept"
+    return columnar_format(request)
+
+def _plain_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def encode_columns(file_format: str, columns: Dict[str, List]) -> bytes:
+    """Encode named columns as one Arrow IPC stream or one MessagePack map of column lists"""
+    module = _import(file_format)
+    if file_format == "msgpack":
+        return module.packb(columns, default=_plain_value, use_bin_type=True)
+
+    table = module.table(columns)
+    sink = module.BufferOutputStream()
+    with module.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def columnar_response(file_format: str, columns: Dict[str, List], response: Optional[Response] = None) -> Response:
+    """Columnar counterpart of json_response; headers set on `response` are carried over"""
+    result = Response(encode_columns(file_format, columns), media_type=COLUMNAR_MEDIA_TYPES[file_format])
+    if response is not None:
+        result.headers.raw.extend(response.headers.raw)
+    return result
+
+def _arrow_type(pyarrow, column):
+    python_type = column.type.python_type
+    if python_type is bool:
+        return pyarrow.bool_()
+    if python_type is int:
+        return pyarrow.int64()
+    if python_type is float:
+        return pyarrow.float64()
+    if python_type is datetime:
+        return pyarrow.timestamp("us")
+    if python_type is date:
+        return pyarrow.date32()
+    if python_type is time:
+        return pyarrow.time64("us")
+    return pyarrow.string()
+
+def stream_columns(file_format: str, columns: Sequence, batches: Iterable[Sequence[Sequence]]) -> Iterator[bytes]:
+    """Encode batches of SELECTed rows as they arrive.
+
+    Arrow output is a single IPC stream with one record batch per row batch,
+    typed from the table columns. MessagePack output is a sequence of maps of
+    column lists, one per batch, readable with msgpack.Unpacker.
+    """
+    module = _import(file_format)
+    names = [column.name for column in columns]
+
+    def generate_msgpack() -> Iterator[bytes]:
+        packer = module.Packer(default=_plain_value, use_bin_type=True)
+        for rows in batches:
+            values = list(zip(*rows)) if rows else [()] * len(names)
+            yield packer.pack({name: list(column_values) for name, column_values in zip(names, values)})
+
+    def generate_arrow() -> Iterator[bytes]:
+        schema = module.schema([module.field(column.name, _arrow_type(module, column)) for column in columns])
+        yield schema.serialize().to_pybytes()
+        for rows in batches:
+            values = list(zip(*rows)) if rows else [()] * len(names)
+            arrays = [module.array(column_values, type=field.type) for column_values, field in zip(values, schema)]
+            yield module.record_batch(arrays, schema=schema).serialize().to_pybytes()
+        yield _ARROW_END_OF_STREAM
+
+    return generate_msgpack() if file_format == "msgpack" else generate_arrow()
@@ -0,0 +1,222 @@
+from sqlalchemy import event, func, inspect, literal, select, true, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from ..models import EntityCounter, SafetyIncident, SafetyTraining, SafetyInspection, PPECompliance
+from .incident_rollups import ROLLUP_ATTRS, apply_incident_rollups
+from .versions import bump_versions
+
+class CounterDefinition:
+    """A maintained row count (or column sum) over one table.
+
+    `condition` is the SQL form used to seed the counter, `matches` and
+    `amount` are the same rules applied to the attribute values of a row.
+    """
+    def __init__(
+        self,
+        name: str,
+        model,
+        attrs: Tuple[str, ...] = (),
+        condition=None,
+        matches: Optional[Callable[[Dict], bool]] = None,
+        column=None,
+        amount: Optional[Callable[[Dict], int]] = None
+    ):
+        self.name = name
+        self.model = model
+        self.attrs = attrs
+        self.condition = condition
+        self.matches = matches or (lambda values: True)
+        self.column = column
+        self.amount = amount or (lambda values: 1)
+
+    def contribution(self, values: Dict) -> int:
+        return self.amount(values) if self.matches(values) else 0
+
+    def _count(self):
+        aggregate = func.coalesce(func.sum(self.column), 0) if self.column is not None else func.count()
+        # The WHERE is always rendered: SQLite needs one before ON CONFLICT in seed()
+        return select(literal(self.name), aggregate).select_from(self.model).where(
+            self.condition if self.condition is not None else true()
+        )
+
+    def count_rows(self, db: Session) -> int:
+        return db.execute(self._count()).one()[1]
+
+    def seed(self):
+        """INSERT of the counter row counted from its table, skipped if the row exists.
+
+        Counting and inserting in one statement runs both under SQLite's write
+        lock, so no concurrent write can commit between them.
+        """
+        return sqlite_insert(EntityCounter).from_select(["name", "count"], self._count()).on_conflict_do_nothing(
+            index_elements=[EntityCounter.name]
+        )
+
+COUNTERS: Dict[str, CounterDefinition] = {
+    counter.name: counter for counter in [
+        CounterDefinition("incidents", SafetyIncident),
+        CounterDefinition(
+            "incidents.open", SafetyIncident, ("status",),
+            condition=SafetyIncident.status == "Open",
+            matches=lambda values: values["status"] == "Open"
+        ),
+        CounterDefinition(
+            "incidents.closed", SafetyIncident, ("status",),
+            condition=SafetyIncident.status == "Closed",
+            matches=lambda values: values["status"] == "Closed"
+        ),
+        CounterDefinition("trainings", SafetyTraining),
+        CounterDefinition("inspections", SafetyInspection),
+        CounterDefinition(
+            "inspections.completed", SafetyInspection, ("status",),
+            condition=SafetyInspection.status == "Completed",
+            matches=lambda values: values["status"] == "Completed"
+        ),
+        CounterDefinition("ppe_compliance", PPECompliance),
+        CounterDefinition(
+            "ppe_compliance.with_violations", PPECompliance, ("violations",),
+            condition=PPECompliance.violations > 0,
+            matches=lambda values: (values["violations"] or 0) > 0
+        ),
+        CounterDefinition(
+            "ppe_compliance.violations", PPECompliance, ("violations",),
+            column=PPECompliance.violations,
+            amount=lambda values: values["violations"] or 0
+        ),
+    ]
+}
+
+# Other aggregates maintained from the same write paths as the counters:
+# model -> [(attributes read, apply(connection, [(attribute values, +1 or -1)]))]
+ROW_AGGREGATES: Dict[type, List[Tuple[Tuple[str, ...], Callable]]] = {
+    SafetyIncident: [(ROLLUP_ATTRS, apply_incident_rollups)],
+}
+
+def _counters_for(model) -> List[CounterDefinition]:
+    return [counter for counter in COUNTERS.values() if counter.model is model]
+
+def has_counters(model) -> bool:
+    """Whether writes to the model's table adjust any counter or row aggregate"""
+    return bool(_counters_for(model)) or model in ROW_AGGREGATES
+
+def counter_attrs(model) -> Set[str]:
+    """Columns of the model that some counter or row aggregate reads"""
+    attrs = {attr for counter in _counters_for(model) for attr in counter.attrs}
+    return attrs.union(*(aggregate_attrs for aggregate_attrs, _ in ROW_AGGREGATES.get(model, [])))
+
+def _apply_aggregates(connection, model, changes: List[Tuple[Dict, int]]) -> None:
+    for attrs, apply in ROW_AGGREGATES.get(model, []):
+        apply(connection, [({attr: values.get(attr) for attr in attrs}, sign) for values, sign in changes])
+
+def get_counts(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """Read maintained counters, seeding any missing ones from their tables"""
+    names = list(names)
+    counts = dict(
+        db.query(EntityCounter.name, EntityCounter.count).filter(EntityCounter.name.in_(names)).all()
+    )
+    missing = [name for name in names if name not in counts]
+    if not missing:
+        return counts
+
+    # A concurrent request or writer may seed them first; ON CONFLICT keeps its row
+    for name in missing:
+        db.execute(COUNTERS[name].seed())
+    db.commit()
+    counts.update(
+        db.query(EntityCounter.name, EntityCounter.count).filter(EntityCounter.name.in_(missing)).all()
+    )
+    return counts
+
+def get_count(db: Session, name: str) -> int:
+    return get_counts(db, [name])[name]
+
+def adjust_counter(connection, name: str, delta: int) -> None:
+    """Apply a delta to a counter, after the write it accounts for.
+
+    An unseeded counter is seeded instead: the count runs in the writer's
+    transaction, so it already includes the rows being written.
+    """
+    if not delta:
+        return
+    updated = connection.execute(
+        update(EntityCounter)
+        .where(EntityCounter.name == name)
+        .values(count=EntityCounter.count + delta)
+    ).rowcount
+    if not updated:
+        connection.execute(COUNTERS[name].seed())
+
+def _rows_contribution(counter: CounterDefinition, rows: List[Dict]) -> int:
+    return sum(counter.contribution({attr: row.get(attr) for attr in counter.attrs}) for row in rows)
+
+def adjust_for_rows(db: Session, model, rows: Iterable[Dict], sign: int = 1) -> None:
+    """Apply counter deltas and bump the table version for rows written with Core statements,
+    which bypass the flush hooks"""
+    rows = list(rows)
+    bump_versions(db, [model.__table__.name])
+    connection = db.connection()
+    for counter in _counters_for(model):
+        adjust_counter(connection, counter.name, sign * _rows_contribution(counter, rows))
+    _apply_aggregates(connection, model, [(row, sign) for row in rows])
+
+def adjust_for_changes(db: Session, model, before: Iterable[Dict], after: Iterable[Dict]) -> None:
+    """Counterpart of adjust_for_rows for rows updated with Core statements, given the
+    counter columns of each row before and after the update"""
+    before, after = list(before), list(after)
+    bump_versions(db, [model.__table__.name])
+    connection = db.connection()
+    for counter in _counters_for(model):
+        if counter.attrs:
+            adjust_counter(
+                connection, counter.name,
+                _rows_contribution(counter, after) - _rows_contribution(counter, before)
+            )
+    _apply_aggregates(connection, model, [(row, -1) for row in before] + [(row, 1) for row in after])
+
+def _current_values(obj, attrs: Tuple[str, ...]) -> Dict:
+    return {attr: getattr(obj, attr) for attr in attrs}
+
+def _previous_values(obj, attrs: Tuple[str, ...]) -> Dict:
+    state = inspect(obj)
+    values = {}
+    for attr in attrs:
+        history = state.attrs[attr].history
+        values[attr] = history.deleted[0] if history.deleted else getattr(obj, attr)
+    return values
+
+@event.listens_for(Session, "after_flush")
+def _track_counts(session: Session, flush_context) -> None:
+    deltas: Dict[str, int] = {}
+    changes: Dict[type, List[Tuple[Dict, int]]] = {}
+
+    def add(name: str, delta: int) -> None:
+        deltas[name] = deltas.get(name, 0) + delta
+
+    def change(obj, values: Callable[[object, Tuple[str, ...]], Dict], sign: int) -> None:
+        if type(obj) in ROW_AGGREGATES:
+            changes.setdefault(type(obj), []).append((values(obj, tuple(counter_attrs(type(obj)))), sign))
+
+    for obj in session.new:
+        for counter in _counters_for(type(obj)):
+            add(counter.name, counter.contribution(_current_values(obj, counter.attrs)))
+        change(obj, _current_values, 1)
+    for obj in session.deleted:
+        for counter in _counters_for(type(obj)):
+            add(counter.name, -counter.contribution(_previous_values(obj, counter.attrs)))
+        change(obj, _previous_values, -1)
+    for obj in session.dirty:
+        for counter in _counters_for(type(obj)):
+            if counter.attrs and session.is_modified(obj):
+                add(counter.name, counter.contribution(_current_values(obj, counter.attrs))
+                    - counter.contribution(_previous_values(obj, counter.attrs)))
+        if session.is_modified(obj):
+            change(obj, _previous_values, -1)
+            change(obj, _current_values, 1)
+
+    if any(deltas.values()) or changes:
+        connection = session.connection()
+        for name, delta in deltas.items():
+            adjust_counter(connection, name, delta)
+        for model, model_changes in changes.items():
+            _apply_aggregates(connection, model, model_changes)
@@ -0,0 +1,39 @@
+from sqlalchemy.orm import Session
+from .counters import get_counts
+
+DASHBOARD_COUNTERS = [
+    "incidents",
+    "incidents.open",
+    "incidents.closed",
+    "trainings",
+    "inspections",
+    "inspections.completed",
+    "ppe_compliance",
+    "ppe_compliance.with_violations",
+    "ppe_compliance.violations",
+]
+
+def get_dashboard_summary(db: Session) -> dict:
+    """Get dashboard totals from the maintained entity counters"""
+    counts = get_counts(db, DASHBOARD_COUNTERS)
+    
+    return {
+        "incidents": {
+            "total": counts["incidents"],
+            "open": counts["incidents.open"],
+            "closed": counts["incidents.closed"]
+        },
+        "trainings": {
+            "total": counts["trainings"]
+        },
+        "inspections": {
+            "total": counts["inspections"],
+            "open": counts["inspections"] - counts["inspections.completed"],
+            "closed": counts["inspections.completed"]
+        },
+        "ppe_compliance": {
+            "total": counts["ppe_compliance"],
+            "with_violations": counts["ppe_compliance.with_violations"],
+            "violations": counts["ppe_compliance.violations"]
+        }
+    }
@@ -1,21 +1,47 @@
+from sqlalchemy import func
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from ..models import Employee
 from ..schemas import EmployeeCreate, EmployeeUpdate
+from .entity_cache import entity_cache
+from .serializers import FieldSet, employee_display_name
+from .writes import (
+    batch_result,
+    delete_many_returning,
+    insert_returning,
+    update_many_returning,
+    update_returning
+)
+
+# Employee payloads, keyed by employee_id or by the directory query parameters
+employee_cache = entity_cache("employees", ["employees"])
+
+employee_fields = FieldSet("employee", Employee.__table__.columns, {
+    "employee_id": "employee_id",
+    "name": (employee_display_name, "first_name", "last_name", "employee_name"),
+    "employee_name": "employee_name",
+    "employee_code": "employee_code",
+    "first_name": "first_name",
+    "last_name": "last_name",
+    "department": "department",
+}, key="employee_id")
+
+def parse_employee_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a comma-separated fields= value; employee_id is always included"""
+    return employee_fields.parse(fields)
 
 class EmployeeService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_employee(self, employee_data: EmployeeCreate) -> Employee:
+    def create_employee(self, employee_data: EmployeeCreate) -> Row:
         try:
-            db_employee = Employee(**employee_data.model_dump())
-            self.db.add(db_employee)
+            employee = insert_returning(self.db, Employee, employee_data.model_dump(), Employee.__table__.columns)
             self.db.commit()
-            self.db.refresh(db_employee)
-            return db_employee
+            return employee
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error creating employee: {str(e)}")
@@ -26,76 +52,105 @@ class EmployeeService:
     def get_employee(self, employee_id: int) -> Optional[Employee]:
         return self.db.query(Employee).filter(Employee.employee_id == employee_id).first()
 
-    def update_employee(self, employee_id: int, employee_data: EmployeeUpdate) -> Employee:
+    def update_employee(self, employee_id: int, employee_data: EmployeeUpdate) -> Row:
         try:
-            db_employee = self.get_employee(employee_id)
-            if not db_employee:
-                raise HTTPException(status_code=404, detail="Employee not found")
-
-            # Update fields
-            update_data = employee_data.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_employee, field, value)
-
+            employee = update_returning(
+                self.db, Employee, employee_id,
+                employee_data.model_dump(exclude_unset=True), Employee.__table__.columns
+            )
             self.db.commit()
-            self.db.refresh(db_employee)
-            return db_employee
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error updating employee: {str(e)}")
+        if employee is None:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        return employee
 
     def delete_employee(self, employee_id: int) -> bool:
         try:
-            db_employee = self.get_employee(employee_id)
-            if not db_employee:
-                return False
-
-            self.db.delete(db_employee)
+            deleted = delete_many_returning(self.db, Employee, [employee_id])
             self.db.commit()
-            return True
+            return bool(deleted)
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error deleting employee: {str(e)}")
 
+    def update_employees(self, employee_ids: List[int], employee_data: EmployeeUpdate) -> Dict:
+        """Apply the same changes to many employees with one UPDATE"""
+        try:
+            rows = update_many_returning(
+                self.db, Employee, employee_ids,
+                employee_data.model_dump(exclude_unset=True), [Employee.employee_id]
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error updating employees: {str(e)}")
+        return batch_result("updated", employee_ids, [row.employee_id for row in rows])
+
+    def delete_employees(self, employee_ids: List[int]) -> Dict:
+        """Delete many employees with one DELETE"""
+        try:
+            deleted = delete_many_returning(self.db, Employee, employee_ids)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error deleting employees: {str(e)}")
+        return batch_result("deleted", employee_ids, deleted)
+
 # Simple service functions for backward compatibility
-def get_employees(db: Session) -> List:
-    """Get all employees"""
-    service = EmployeeService(db)
-    employees = service.get_employees()
+# Full payloads from RETURNING rows of all employee columns
+_employee_row_serializer = employee_fields.serializer()
+
+def get_employees(
+    db: Session,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    after_id: Optional[int] = None,
+    department: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None
+) -> List:
+    """Get employees, optionally paged, filtered by department and narrowed to some fields"""
+    fields = tuple(fields) if fields else None
     
-    # Convert to dict format
-    result = []
-    for employee in employees:
-        employee_dict = {
-            "employee_id": employee.employee_id,
-            "name": f"{employee.first_name} {employee.last_name}" if employee.first_name and employee.last_name else employee.employee_name,
-            "employee_name": employee.employee_name,
-            "employee_code": employee.employee_code,
-            "first_name": employee.first_name,
-            "last_name": employee.last_name,
-            "department": employee.department
-        }
-        result.append(employee_dict)
+    def load():
+        serializer = employee_fields.serializer(fields)
+        query = db.query(*serializer.columns).order_by(Employee.employee_id)
+        if department is not None:
+            query = query.filter(Employee.department == department)
+        if after_id is not None:
+            query = query.filter(Employee.employee_id > after_id)
+        elif skip:
+            query = query.offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        return serializer.to_list(query.all())
     
-    return result
+    # An unbounded list (all=true) can hold every employee; it is not worth a cache entry
+    if limit is None:
+        return load()
+    return employee_cache.get_or_load(("list", skip, limit, after_id, department, fields), load)
 
-def get_employee_by_id(db: Session, employee_id: int):
-    """Get a specific employee by ID"""
-    service = EmployeeService(db)
-    employee = service.get_employee(employee_id)
+def count_employees(db: Session, department: Optional[str] = None) -> int:
+    """Count employees, optionally in one department"""
+    def load():
+        query = db.query(func.count(Employee.employee_id))
+        if department is not None:
+            query = query.filter(Employee.department == department)
+        return query.scalar()
+    
+    return employee_cache.get_or_load(("count", department), load)
+
+def get_employee_by_id(db: Session, employee_id: int, fields: Optional[Sequence[str]] = None):
+    """Get a specific employee by ID, narrowed to some fields"""
+    fields = tuple(fields) if fields else None
     
-    if not employee:
-        return None
+    def load():
+        serializer = employee_fields.serializer(fields)
+        employee = db.query(*serializer.columns).filter(Employee.employee_id == employee_id).first()
+        return serializer.to_dict(employee) if employee else None
     
-    return {
-        "employee_id": employee.employee_id,
-        "name": f"{employee.first_name} {employee.last_name}" if employee.first_name and employee.last_name else employee.employee_name,
-        "employee_name": employee.employee_name,
-        "employee_code": employee.employee_code,
-        "first_name": employee.first_name,
-        "last_name": employee.last_name,
-        "department": employee.department
-    }
+    return employee_cache.get_or_load(employee_id if fields is None else (employee_id, fields), load)
 
 def create_employee(db: Session, employee_data):
     """Create a new employee"""
@@ -107,16 +162,7 @@ def create_employee(db: Session, employee_data):
         employee_data = EmployeeCreate(**employee_data)
     
     employee = service.create_employee(employee_data)
-    
-    return {
-        "employee_id": employee.employee_id,
-        "name": f"{employee.first_name} {employee.last_name}" if employee.first_name and employee.last_name else employee.employee_name,
-        "employee_name": employee.employee_name,
-        "employee_code": employee.employee_code,
-        "first_name": employee.first_name,
-        "last_name": employee.last_name,
-        "department": employee.department
-    }
+    return _employee_row_serializer.to_dict(employee)
 
 def update_employee(db: Session, employee_id: int, employee_data):
     """Update an existing employee"""
@@ -128,18 +174,25 @@ def update_employee(db: Session, employee_id: int, employee_data):
         employee_data = EmployeeUpdate(**employee_data)
     
     employee = service.update_employee(employee_id, employee_data)
-    
-    return {
-        "employee_id": employee.employee_id,
-        "name": f"{employee.first_name} {employee.last_name}" if employee.first_name and employee.last_name else employee.employee_name,
-        "employee_name": employee.employee_name,
-        "employee_code": employee.employee_code,
-        "first_name": employee.first_name,
-        "last_name": employee.last_name,
-        "department": employee.department
-    }
+    return _employee_row_serializer.to_dict(employee)
 
 def delete_employee(db: Session, employee_id: int) -> bool:
     """Delete an employee"""
     service = EmployeeService(db)
     return service.delete_employee(employee_id)
+
+def update_employees(db: Session, employee_ids: List[int], employee_data) -> Dict:
+    """Apply the same changes to many employees"""
+    service = EmployeeService(db)
+    
+    # Convert dict to Pydantic model if needed
+    if isinstance(employee_data, dict):
+        from ..schemas import EmployeeUpdate
+        employee_data = EmployeeUpdate(**employee_data)
+    
+    return service.update_employees(employee_ids, employee_data)
+
+def delete_employees(db: Session, employee_ids: List[int]) -> Dict:
+    """Delete many employees"""
+    service = EmployeeService(db)
+    return service.delete_employees(employee_ids)
@@ -0,0 +1,102 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+from ..config import settings
+from .versions import WRITTEN_TABLES_KEY
+
+class EntityCache:
+    """Bounded LRU cache with a TTL for read-only service payloads.
+
+    Each cache declares the tables its payloads are built from; a commit that
+    wrote any of them clears the cache. Cached values are shared between
+    requests and must not be mutated.
+    """
+    def __init__(self, name: str, tables: Iterable[str], max_entries: int = None, ttl_seconds: float = None):
+        self.name = name
+        self.tables = frozenset(tables)
+        self.max_entries = max_entries if max_entries is not None else settings.cache_max_entries
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.cache_ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+        # Bumped by clear() so a load that raced with an invalidation is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling load on a miss; None results are not cached"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        value = load()
+        if value is not None:
+            with self._lock:
+                if generation != self._generation:
+                    return value
+                self._entries[key] = (now + self.ttl_seconds, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None
+            }
+
+_caches: Dict[str, EntityCache] = {}
+
+def entity_cache(name: str, tables: Iterable[str], max_entries: int = None, ttl_seconds: float = None) -> EntityCache:
+    """Create (or return) the named cache"""
+    if name not in _caches:
+        _caches[name] = EntityCache(name, tables, max_entries, ttl_seconds)
+    return _caches[name]
+
+def invalidate_tables(tables: Iterable[str]) -> None:
+    tables = set(tables)
+    for cache in _caches.values():
+        if cache.tables & tables:
+            cache.clear()
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    tables = session.info.pop(WRITTEN_TABLES_KEY, None)
+    if tables:
+        invalidate_tables(tables)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(WRITTEN_TABLES_KEY, None)
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from typing import Iterator
+from ..models import SafetyIncident, SafetyInspection, SafetyTraining, PPECompliance, Employee
+from .columnar import COLUMNAR_MEDIA_TYPES, stream_columns
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MODELS = {
+    "incidents": SafetyIncident,
+    "inspections": SafetyInspection,
+    "trainings": SafetyTraining,
+    "ppe_compliance": PPECompliance,
+    "employees": Employee,
+}
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    **COLUMNAR_MEDIA_TYPES,
+}
+EXPORT_EXTENSIONS = {
+    "csv": "csv",
+    "ndjson": "ndjson",
+    "arrow": "arrows",
+    "msgpack": "msgpack",
+}
+
+def _plain_value(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return value
+
+def export_rows(db: Session, entity: str, file_format: str) -> Iterator[bytes]:
+    """Stream every row of an entity table as CSV, NDJSON, Arrow IPC or MessagePack.
+
+    Rows are fetched in batches of EXPORT_BATCH_SIZE straight from the table
+    columns, so memory stays flat regardless of table size. The columnar
+    formats encode each batch column by column (see stream_columns).
+    """
+    model = EXPORT_MODELS.get(entity)
+    if model is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export entity: {entity}")
+    if file_format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {file_format}")
+
+    table = model.__table__
+    columns = [column.name for column in table.columns]
+    statement = select(table).order_by(*table.primary_key.columns)
+
+    if file_format in COLUMNAR_MEDIA_TYPES:
+        def batches():
+            result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            yield from result.partitions()
+
+        return stream_columns(file_format, table.columns, batches())
+
+    def generate() -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if file_format == "csv" else None
+        if writer:
+            writer.writerow(columns)
+            yield buffer.getvalue().encode()
+
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            for row in rows:
+                values = [_plain_value(value) for value in row]
+                if writer:
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values))))
+                    buffer.write("\n")
+            yield buffer.getvalue().encode()
+
+    return generate()
@@ -0,0 +1,113 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from ..models import IncidentRollup, SafetyIncident
+
+ROLLUP_PERIODS = ("day", "week", "month")
+ROLLUP_GROUPS = ("location_id", "injury_severity")
+
+# Incident columns the rollups are keyed on; writes that change one of them move the incident between buckets
+ROLLUP_ATTRS = ("date_time", "location_id", "injury_severity")
+
+# Incidents without a severity are counted under "" so that the key has no NULLs
+_NO_SEVERITY = ""
+
+# Rows per upsert statement, well inside SQLite's bound parameter limit
+_UPSERT_CHUNK = 1000
+
+def bucket_start(period: str, moment: datetime) -> date:
+    """First day of the day, week (starting Monday) or month containing moment"""
+    day = moment.date() if isinstance(moment, datetime) else moment
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+def _bucket_sql(period: str):
+    # SQL counterpart of bucket_start, used to rebuild from safety_incidents
+    if period == "week":
+        return func.date(SafetyIncident.date_time, "-6 days", "weekday 1")
+    if period == "month":
+        return func.date(SafetyIncident.date_time, "start of month")
+    return func.date(SafetyIncident.date_time)
+
+def apply_incident_rollups(connection, changes: Iterable[Tuple[Dict, int]]) -> None:
+    """Add each incident's sign to its day, week and month buckets with batched upserts.
+
+    `changes` pairs the rollup attributes of written incidents with +1 for
+    inserted (or updated-to) values and -1 for deleted (or updated-from)
+    ones, so an update that leaves the keys alone nets out to no write.
+    """
+    deltas: Dict[Tuple, int] = {}
+    for values, sign in changes:
+        severity = values["injury_severity"] or _NO_SEVERITY
+        for period in ROLLUP_PERIODS:
+            key = (period, bucket_start(period, values["date_time"]), values["location_id"], severity)
+            deltas[key] = deltas.get(key, 0) + sign
+
+    rows = [
+        {"period": period, "bucket": bucket, "location_id": location_id, "injury_severity": severity, "count": delta}
+        for (period, bucket, location_id, severity), delta in deltas.items() if delta
+    ]
+    key_columns = [column.name for column in IncidentRollup.__table__.primary_key.columns]
+    for start in range(0, len(rows), _UPSERT_CHUNK):
+        statement = sqlite_insert(IncidentRollup).values(rows[start:start + _UPSERT_CHUNK])
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={"count": IncidentRollup.count + statement.excluded.count}
+        ))
+
+def rebuild_incident_rollups(db: Session) -> int:
+    """Recompute every rollup from safety_incidents; returns the number of rollup rows written"""
+    db.execute(delete(IncidentRollup))
+    written = 0
+    for period in ROLLUP_PERIODS:
+        bucket = _bucket_sql(period)
+        severity = func.coalesce(SafetyIncident.injury_severity, _NO_SEVERITY)
+        written += db.execute(
+            insert(IncidentRollup).from_select(
+                ["period", "bucket", "location_id", "injury_severity", "count"],
+                select(literal(period), bucket, SafetyIncident.location_id, severity, func.count())
+                .group_by(bucket, SafetyIncident.location_id, severity)
+            )
+        ).rowcount
+    db.commit()
+    return written
+
+def get_incident_rollups(
+    db: Session,
+    period: str = "month",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    location_id: Optional[Sequence[int]] = None,
+    injury_severity: Optional[Sequence[str]] = None,
+    group_by: Sequence[str] = ()
+) -> List[Dict]:
+    """Incident counts per bucket of the period, optionally split by location and severity.
+
+    Buckets that overlap [date_from, date_to) are included.
+    """
+    groups = [getattr(IncidentRollup, group) for group in ROLLUP_GROUPS if group in group_by]
+    total = func.sum(IncidentRollup.count)
+    query = db.query(IncidentRollup.bucket, *groups, total.label("count")).filter(IncidentRollup.period == period)
+    if date_from is not None:
+        query = query.filter(IncidentRollup.bucket >= bucket_start(period, date_from))
+    if date_to is not None:
+        query = query.filter(IncidentRollup.bucket < date_to)
+    if location_id:
+        query = query.filter(IncidentRollup.location_id.in_(location_id))
+    if injury_severity:
+        query = query.filter(IncidentRollup.injury_severity.in_(injury_severity))
+    query = query.group_by(IncidentRollup.bucket, *groups).having(total > 0)
+    query = query.order_by(IncidentRollup.bucket, *groups)
+
+    result = []
+    for row in query.all():
+        item = row._asdict()
+        if "injury_severity" in item:
+            item["injury_severity"] = item["injury_severity"] or None
+        result.append(item)
+    return result
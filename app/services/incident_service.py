@@ -1,21 +1,78 @@
+import csv
+import json
+from datetime import datetime
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
-from typing import List, Optional
-from ..models import SafetyIncident
-from ..schemas import SafetyIncidentCreate, SafetyIncidentUpdate
+from pydantic import ValidationError
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+from ..models import Location, SafetyIncident
+from ..schemas import SafetyIncidentCreate, SafetyIncidentUpdate, SafetyIncidentFilter
+from .counters import adjust_for_rows
+from .entity_cache import entity_cache
+from .serializers import FieldSet
+from .writes import (
+    batch_result,
+    delete_many_returning,
+    insert_returning,
+    update_many_returning,
+    update_returning
+)
+
+# Incident response payloads by incident_id
+incident_cache = entity_cache("incidents", ["safety_incidents"])
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_FORMATS = ("csv", "jsonl")
+
+# Sort keys accepted by get_incidents; a leading "-" sorts descending.
+# Ties are broken on incident_id so every key gives a stable cursor.
+INCIDENT_SORT_KEYS = {
+    "incident_id": (SafetyIncident.incident_id,),
+    "date_time": (SafetyIncident.date_time, SafetyIncident.incident_id),
+}
+INCIDENT_SORT_PATTERN = "^-?(" + "|".join(INCIDENT_SORT_KEYS) + ")$"
+
+def incident_cursor_parsers(sort: str) -> List[Callable]:
+    """Parsers for the values of a cursor produced under the given sort"""
+    if sort.lstrip("-") == "date_time":
+        return [datetime.fromisoformat, int]
+    return [int]
+
+def incident_cursor_key(incident: Row, sort: str) -> List[Any]:
+    """Sort key of an incident as stored in the next-page cursor"""
+    if sort.lstrip("-") == "date_time":
+        return [incident.date_time.isoformat(), incident.incident_id]
+    return [incident.incident_id]
+
+# SafetyIncidentResponse fields over the incident columns
+incident_fields = FieldSet("incident", SafetyIncident.__table__.columns, {
+    "date_time": "date_time",
+    "location_id": "location_id",
+    "incident_type": "incident_type",
+    "description": "description",
+    "injury_severity": "injury_severity",
+    "reporter_name": "reporter_name",
+    "status": "status",
+    "incident_id": "incident_id",
+    "created_at": "created_at",
+    "updated_at": "updated_at"
+}, key="incident_id")
+incident_serializer = incident_fields.serializer()
 
 class SafetyIncidentService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_incident(self, incident_data: SafetyIncidentCreate) -> SafetyIncident:
+    def create_incident(self, incident_data: SafetyIncidentCreate) -> Row:
         try:
-            db_incident = SafetyIncident(**incident_data.model_dump())
-            self.db.add(db_incident)
+            incident = insert_returning(
+                self.db, SafetyIncident, incident_data.model_dump(), SafetyIncident.__table__.columns
+            )
             self.db.commit()
-            self.db.refresh(db_incident)
-            return db_incident
+            return incident
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error creating incident: {str(e)}")
@@ -26,28 +83,197 @@ class SafetyIncidentService:
             raise HTTPException(status_code=404, detail="Incident not found")
         return incident
 
-    def get_incidents(self, skip: int = 0, limit: int = 100) -> List[SafetyIncident]:
-        return self.db.query(SafetyIncident).offset(skip).limit(limit).all()
+    def _filter_incidents(self, query, filters: Optional[SafetyIncidentFilter]):
+        if filters is None:
+            return query
+        if filters.status:
+            query = query.filter(SafetyIncident.status.in_(filters.status))
+        if filters.location_id:
+            query = query.filter(SafetyIncident.location_id.in_(filters.location_id))
+        if filters.injury_severity:
+            query = query.filter(SafetyIncident.injury_severity.in_(filters.injury_severity))
+        if filters.incident_type:
+            query = query.filter(SafetyIncident.incident_type.in_(filters.incident_type))
+        if filters.date_from is not None:
+            query = query.filter(SafetyIncident.date_time >= filters.date_from)
+        if filters.date_to is not None:
+            query = query.filter(SafetyIncident.date_time < filters.date_to)
+        return query
+
+    def get_incident_data(self, incident_id: int, fields: Optional[Tuple[str, ...]] = None) -> Dict:
+        """Get an incident as a response payload, served from the entity cache when possible"""
+        serializer = incident_fields.serializer(fields)
+
+        def load():
+            incident = (
+                self.db.query(*serializer.columns)
+                .filter(SafetyIncident.incident_id == incident_id)
+                .first()
+            )
+            if incident is None:
+                raise HTTPException(status_code=404, detail="Incident not found")
+            return serializer.to_dict(incident)
+
+        return incident_cache.get_or_load(incident_id if fields is None else (incident_id, fields), load)
+
+    def get_incidents(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[List] = None,
+        filters: Optional[SafetyIncidentFilter] = None,
+        sort: str = "incident_id",
+        columns: Sequence = tuple(SafetyIncident.__table__.columns)
+    ) -> List[Row]:
+        """Select a page of incidents; the sort key columns are added to `columns` for the cursor"""
+        descending = sort.startswith("-")
+        keys = INCIDENT_SORT_KEYS[sort.lstrip("-")]
 
-    def update_incident(self, incident_id: int, incident_data: SafetyIncidentUpdate) -> SafetyIncident:
-        incident = self.get_incident(incident_id)
+        selected = {column.key for column in columns}
+        columns = [*columns, *(key for key in keys if key.key not in selected)]
+        query = self._filter_incidents(self.db.query(*columns), filters)
+        query = query.order_by(*(key.desc() if descending else key for key in keys))
+        if after is not None:
+            # Keyset condition on the (sort column, incident_id) row value
+            current = tuple_(*keys) if len(keys) > 1 else keys[0]
+            last = tuple_(*after) if len(keys) > 1 else after[0]
+            query = query.filter(current < last if descending else current > last)
+        else:
+            query = query.offset(skip)
+        return query.limit(limit).all()
+
+    def count_incidents(self, filters: SafetyIncidentFilter) -> int:
+        return self._filter_incidents(self.db.query(func.count(SafetyIncident.incident_id)), filters).scalar()
+
+    def update_incident(self, incident_id: int, incident_data: SafetyIncidentUpdate) -> Row:
         try:
-            update_data = incident_data.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(incident, field, value)
+            incident = update_returning(
+                self.db, SafetyIncident, incident_id,
+                incident_data.model_dump(exclude_unset=True), SafetyIncident.__table__.columns
+            )
             self.db.commit()
-            self.db.refresh(incident)
-            return incident
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error updating incident: {str(e)}")
+        if incident is None:
+            raise HTTPException(status_code=404, detail="Incident not found")
+        return incident
+
+    def update_incidents(self, incident_ids: List[int], incident_data: SafetyIncidentUpdate) -> Dict:
+        """Apply the same changes to many incidents with one UPDATE"""
+        try:
+            rows = update_many_returning(
+                self.db, SafetyIncident, incident_ids,
+                incident_data.model_dump(exclude_unset=True), [SafetyIncident.incident_id]
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error updating incidents: {str(e)}")
+        return batch_result("updated", incident_ids, [row.incident_id for row in rows])
+
+    def import_incidents(self, stream: TextIO, file_format: str) -> Dict:
+        """Validate and insert incidents from a CSV or JSONL stream in batches.
+
+        Each batch is inserted with one executemany in its own transaction, so a
+        failing batch does not undo rows that were already imported.
+        """
+        if file_format not in IMPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported import format: {file_format}")
+
+        rows = _read_csv_rows(stream) if file_format == "csv" else _read_jsonl_rows(stream)
+        report = {"imported": 0, "failed": 0, "errors": []}
+        batch: List[Tuple[int, Dict]] = []
+
+        for row_number, row, error in rows:
+            if error is None:
+                try:
+                    incident = SafetyIncidentCreate.model_validate(row)
+                    batch.append((row_number, incident.model_dump()))
+                except ValidationError as e:
+                    error = [
+                        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in e.errors()
+                    ]
+            if error is not None:
+                report["failed"] += 1
+                report["errors"].append({"row": row_number, "errors": error})
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                self._insert_incident_batch(batch, report)
+                batch = []
+
+        if batch:
+            self._insert_incident_batch(batch, report)
+        return report
+
+    def _insert_incident_batch(self, batch: List[Tuple[int, Dict]], report: Dict) -> None:
+        # Foreign keys are enforced, so check locations up front rather than fail the whole batch
+        location_ids = {incident["location_id"] for _, incident in batch}
+        known = set(self.db.scalars(select(Location.location_id).where(Location.location_id.in_(location_ids))))
+        for row_number, incident in batch:
+            if incident["location_id"] not in known:
+                report["failed"] += 1
+                report["errors"].append(
+                    {"row": row_number, "errors": [f"location_id: Unknown location {incident['location_id']}"]}
+                )
+        batch = [(row_number, incident) for row_number, incident in batch if incident["location_id"] in known]
+        if not batch:
+            return
+
+        now = datetime.utcnow()
+        values = [dict(incident, created_at=now, updated_at=now) for _, incident in batch]
+        try:
+            self.db.execute(insert(SafetyIncident), values)
+            adjust_for_rows(self.db, SafetyIncident, values)
+            self.db.commit()
+            report["imported"] += len(batch)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            report["failed"] += len(batch)
+            report["errors"].extend(
+                {"row": row_number, "errors": [f"Error importing incident: {str(e)}"]} for row_number, _ in batch
+            )
 
     def delete_incident(self, incident_id: int) -> bool:
-        incident = self.get_incident(incident_id)
         try:
-            self.db.delete(incident)
+            deleted = delete_many_returning(self.db, SafetyIncident, [incident_id])
             self.db.commit()
-            return True
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error deleting incident: {str(e)}")
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Incident not found")
+        return True
+
+    def delete_incidents(self, incident_ids: List[int]) -> Dict:
+        """Delete many incidents with one DELETE"""
+        try:
+            deleted = delete_many_returning(self.db, SafetyIncident, incident_ids)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error deleting incidents: {str(e)}")
+        return batch_result("deleted", incident_ids, deleted)
+
+def _read_csv_rows(stream: TextIO) -> Iterator[Tuple[int, Dict, Optional[List[str]]]]:
+    reader = csv.DictReader(stream)
+    for row_number, row in enumerate(reader, start=1):
+        if None in row:
+            yield row_number, row, ["Row has more columns than the header"]
+            continue
+        # Empty CSV cells mean "not provided" so that schema defaults apply
+        yield row_number, {field: value for field, value in row.items() if value not in ("", None)}, None
+
+def _read_jsonl_rows(stream: TextIO) -> Iterator[Tuple[int, Dict, Optional[List[str]]]]:
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield row_number, {}, [f"Invalid JSON: {str(e)}"]
+            continue
+        if not isinstance(row, dict):
+            yield row_number, {}, ["Expected a JSON object"]
+            continue
+        yield row_number, row, None
@@ -0,0 +1,216 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import Integer, and_, cast, func, literal, or_, select, true, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from typing import Dict, List, Optional, Sequence
+from ..models import InspectionSchedule, Location, SafetyInspection
+from ..schemas import InspectionScheduleCreate, InspectionScheduleUpdate
+from .counters import adjust_for_rows
+from .serializers import RowSerializer
+from .writes import delete_many_returning, insert_returning, update_returning
+
+# Status of every generated inspection
+SCHEDULED_STATUS = "Scheduled"
+
+# Longest window one generate call may cover
+GENERATE_MAX_DAYS = 1096
+
+_SCHEDULE_COLUMNS = tuple(InspectionSchedule.__table__.columns)
+schedule_serializer = RowSerializer(_SCHEDULE_COLUMNS, {column.key: column.key for column in _SCHEDULE_COLUMNS})
+
+_GENERATED_COLUMNS = [
+    "inspection_type", "inspection_date", "inspection_time", "location_id",
+    "inspector_name", "notes", "status", "created_at", "schedule_id"
+]
+
+def _day_number(day):
+    return cast(func.julianday(day), Integer)
+
+def _month_number(day):
+    return cast(func.strftime("%Y", day), Integer) * 12 + cast(func.strftime("%m", day), Integer)
+
+def _day_of_month(day):
+    return cast(func.strftime("%d", day), Integer)
+
+def _calendar(date_from: date, days: int):
+    """CTE of the days in the window with the date parts the recurrence rules compare"""
+    last_day = date_from + timedelta(days=days - 1)
+    dates = select(literal(date_from.isoformat()).label("day")).cte("dates", recursive=True)
+    dates = dates.union_all(select(func.date(dates.c.day, "+1 day")).where(dates.c.day < last_day.isoformat()))
+    return select(
+        dates.c.day,
+        _day_number(dates.c.day).label("day_number"),
+        _month_number(dates.c.day).label("month_number"),
+        _day_of_month(dates.c.day).label("day_of_month"),
+        _day_of_month(func.date(dates.c.day, "start of month", "+1 month", "-1 day")).label("month_days")
+    ).cte("calendar")
+
+def _rules(schedule_ids: Optional[Sequence[int]]):
+    """CTE of the schedules with the same date parts of their start_date"""
+    schedule = InspectionSchedule
+    query = select(
+        *_SCHEDULE_COLUMNS,
+        _day_number(schedule.start_date).label("start_day_number"),
+        _month_number(schedule.start_date).label("start_month_number"),
+        _day_of_month(schedule.start_date).label("start_day_of_month")
+    )
+    if schedule_ids:
+        query = query.where(schedule.schedule_id.in_(list(schedule_ids)))
+    return query.cte("rules")
+
+def _recurs(rules, calendar):
+    """SQL condition that the rule falls on the calendar day; with the date parts computed
+    once per day and per rule, it is integer arithmetic over every pair"""
+    elapsed = calendar.c.day_number - rules.c.start_day_number
+    months = calendar.c.month_number - rules.c.start_month_number
+    return and_(
+        calendar.c.day >= rules.c.start_date,
+        or_(rules.c.end_date.is_(None), calendar.c.day <= rules.c.end_date),
+        or_(
+            and_(rules.c.frequency == "daily", elapsed % rules.c.interval == 0),
+            and_(rules.c.frequency == "weekly", elapsed % (rules.c.interval * 7) == 0),
+            # Monthly rules anchored on the 29th-31st fall on the last day of shorter months
+            and_(
+                rules.c.frequency == "monthly",
+                months % rules.c.interval == 0,
+                calendar.c.day_of_month == func.min(rules.c.start_day_of_month, calendar.c.month_days)
+            ),
+        )
+    )
+
+def _occurrences(rules, calendar, every_location: bool, created_at: datetime):
+    """SELECT of the inspections that rules with (or without) a location_id produce over the calendar"""
+    location_id = Location.location_id if every_location else rules.c.location_id
+    query = (
+        select(
+            rules.c.inspection_type, calendar.c.day, rules.c.inspection_time, location_id,
+            rules.c.inspector_name, rules.c.notes, literal(SCHEDULED_STATUS), literal(created_at),
+            rules.c.schedule_id
+        )
+        .select_from(rules)
+        .join(calendar, _recurs(rules, calendar))
+    )
+    if every_location:
+        return query.join(Location, true()).where(rules.c.location_id.is_(None))
+    return query.where(rules.c.location_id.isnot(None))
+
+def generate_scheduled_inspections(
+    db: Session,
+    date_from: date,
+    days: int,
+    schedule_ids: Optional[Sequence[int]] = None
+) -> int:
+    """Insert the inspections the schedules call for on the `days` days starting at date_from
+    with one INSERT ... SELECT; returns the number of inspections created.
+
+    Days come from a recursive CTE joined to the schedules, so the whole window
+    is a single statement whatever the number of schedules and locations.
+    Inspections that already exist for a schedule, location and day are skipped
+    through the unique index on those columns, which makes re-running idempotent.
+    """
+    rules, calendar = _rules(schedule_ids), _calendar(date_from, days)
+    created_at = datetime.utcnow()
+    occurrences = union_all(
+        _occurrences(rules, calendar, False, created_at),
+        _occurrences(rules, calendar, True, created_at)
+    )
+    db.execute(
+        sqlite_insert(SafetyInspection)
+        .from_select(_GENERATED_COLUMNS, occurrences)
+        .on_conflict_do_nothing(index_elements=["schedule_id", "location_id", "inspection_date"])
+    )
+    # The statement starts with WITH, for which the sqlite3 driver reports no rowcount;
+    # changes() counts the rows it inserted, leaving out those of the search triggers
+    inserted = db.execute(select(func.changes())).scalar()
+    if inserted:
+        # Every generated inspection has the same counter attributes
+        adjust_for_rows(db, SafetyInspection, [{"status": SCHEDULED_STATUS}] * inserted)
+    return inserted
+
+class InspectionScheduleService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_schedule(self, schedule_data: InspectionScheduleCreate) -> Row:
+        try:
+            schedule = insert_returning(self.db, InspectionSchedule, schedule_data.model_dump(), _SCHEDULE_COLUMNS)
+            self.db.commit()
+            return schedule
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error creating inspection schedule: {str(e)}")
+
+    def update_schedule(self, schedule_id: int, schedule_data: InspectionScheduleUpdate) -> Row:
+        try:
+            schedule = update_returning(
+                self.db, InspectionSchedule, schedule_id,
+                schedule_data.model_dump(exclude_unset=True), _SCHEDULE_COLUMNS
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error updating inspection schedule: {str(e)}")
+        if schedule is None:
+            raise HTTPException(status_code=404, detail="Inspection schedule not found")
+        return schedule
+
+    def delete_schedule(self, schedule_id: int) -> bool:
+        try:
+            deleted = delete_many_returning(self.db, InspectionSchedule, [schedule_id])
+            self.db.commit()
+            return bool(deleted)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error deleting inspection schedule: {str(e)}")
+
+    def generate_inspections(self, date_from: date, days: int, schedule_ids: Optional[Sequence[int]] = None) -> int:
+        try:
+            inserted = generate_scheduled_inspections(self.db, date_from, days, schedule_ids)
+            self.db.commit()
+            return inserted
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error generating inspections: {str(e)}")
+
+# Simple service functions for backward compatibility
+def get_schedules(db: Session, location_id: Optional[Sequence[int]] = None) -> List[Dict]:
+    """Get inspection schedules, optionally only those of some locations"""
+    query = db.query(*_SCHEDULE_COLUMNS)
+    if location_id:
+        query = query.filter(InspectionSchedule.location_id.in_(location_id))
+    return schedule_serializer.to_list(query.order_by(InspectionSchedule.schedule_id).all())
+
+def get_schedule_by_id(db: Session, schedule_id: int) -> Optional[Dict]:
+    """Get a specific inspection schedule by ID"""
+    row = db.query(*_SCHEDULE_COLUMNS).filter(InspectionSchedule.schedule_id == schedule_id).first()
+    return schedule_serializer.to_dict(row) if row else None
+
+def create_schedule(db: Session, schedule_data: InspectionScheduleCreate) -> Dict:
+    """Create a new inspection schedule"""
+    return schedule_serializer.to_dict(InspectionScheduleService(db).create_schedule(schedule_data))
+
+def update_schedule(db: Session, schedule_id: int, schedule_data: InspectionScheduleUpdate) -> Dict:
+    """Update an existing inspection schedule; inspections it already generated are left as they are"""
+    return schedule_serializer.to_dict(InspectionScheduleService(db).update_schedule(schedule_id, schedule_data))
+
+def delete_schedule(db: Session, schedule_id: int) -> bool:
+    """Delete an inspection schedule; inspections it already generated are kept"""
+    return InspectionScheduleService(db).delete_schedule(schedule_id)
+
+def generate_inspections(
+    db: Session,
+    date_from: Optional[date] = None,
+    days: int = 365,
+    schedule_ids: Optional[Sequence[int]] = None
+) -> Dict:
+    """Materialize the upcoming inspections of the schedules, from today unless date_from is given"""
+    date_from = date_from or date.today()
+    inserted = InspectionScheduleService(db).generate_inspections(date_from, days, schedule_ids)
+    return {
+        "generated": inserted,
+        "date_from": date_from,
+        "date_to": date_from + timedelta(days=days - 1)
+    }
@@ -1,21 +1,46 @@
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from ..models import SafetyInspection, Location
 from ..schemas import SafetyInspectionCreate, SafetyInspectionUpdate
+from .location_service import location_names
+from .entity_cache import entity_cache
+from .serializers import FieldSet, RowSerializer
+from .writes import (
+    batch_result,
+    delete_many_returning,
+    insert_returning,
+    update_many_returning,
+    update_returning
+)
+
+# Inspection payloads by inspection_id; they embed the location name
+inspection_cache = entity_cache("inspections", ["safety_inspections", "locations"])
+
+_INSPECTION_COLUMNS = (
+    SafetyInspection.inspection_id,
+    SafetyInspection.inspection_type,
+    SafetyInspection.location_id,
+    SafetyInspection.inspector_name,
+    SafetyInspection.inspection_date,
+    SafetyInspection.status,
+    SafetyInspection.score,
+    SafetyInspection.notes
+)
 
 class SafetyInspectionService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_inspection(self, inspection_data: SafetyInspectionCreate) -> SafetyInspection:
+    def create_inspection(self, inspection_data: SafetyInspectionCreate) -> Row:
         try:
-            db_inspection = SafetyInspection(**inspection_data.model_dump())
-            self.db.add(db_inspection)
+            inspection = insert_returning(
+                self.db, SafetyInspection, inspection_data.model_dump(), _INSPECTION_COLUMNS
+            )
             self.db.commit()
-            self.db.refresh(db_inspection)
-            return db_inspection
+            return inspection
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error creating inspection: {str(e)}")
@@ -26,90 +51,168 @@ class SafetyInspectionService:
     def get_inspection(self, inspection_id: int) -> Optional[SafetyInspection]:
         return self.db.query(SafetyInspection).filter(SafetyInspection.inspection_id == inspection_id).first()
 
-    def update_inspection(self, inspection_id: int, inspection_data: SafetyInspectionUpdate) -> SafetyInspection:
+    def update_inspection(self, inspection_id: int, inspection_data: SafetyInspectionUpdate) -> Row:
         try:
-            db_inspection = self.get_inspection(inspection_id)
-            if not db_inspection:
-                raise HTTPException(status_code=404, detail="Inspection not found")
-
-            # Update fields
-            update_data = inspection_data.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_inspection, field, value)
-
+            inspection = update_returning(
+                self.db, SafetyInspection, inspection_id,
+                inspection_data.model_dump(exclude_unset=True), _INSPECTION_COLUMNS
+            )
             self.db.commit()
-            self.db.refresh(db_inspection)
-            return db_inspection
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error updating inspection: {str(e)}")
+        if inspection is None:
+            raise HTTPException(status_code=404, detail="Inspection not found")
+        return inspection
 
     def delete_inspection(self, inspection_id: int) -> bool:
         try:
-            db_inspection = self.get_inspection(inspection_id)
-            if not db_inspection:
-                return False
-
-            self.db.delete(db_inspection)
+            deleted = delete_many_returning(self.db, SafetyInspection, [inspection_id])
             self.db.commit()
-            return True
+            return bool(deleted)
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error deleting inspection: {str(e)}")
 
+    def update_inspections(self, inspection_ids: List[int], inspection_data: SafetyInspectionUpdate) -> Dict:
+        """Apply the same changes to many inspections with one UPDATE"""
+        try:
+            rows = update_many_returning(
+                self.db, SafetyInspection, inspection_ids,
+                inspection_data.model_dump(exclude_unset=True), [SafetyInspection.inspection_id]
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error updating inspections: {str(e)}")
+        return batch_result("updated", inspection_ids, [row.inspection_id for row in rows])
+
+    def delete_inspections(self, inspection_ids: List[int]) -> Dict:
+        """Delete many inspections with one DELETE"""
+        try:
+            deleted = delete_many_returning(self.db, SafetyInspection, inspection_ids)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error deleting inspections: {str(e)}")
+        return batch_result("deleted", inspection_ids, deleted)
+
 # Simple service functions for backward compatibility
-def get_inspections(db: Session, skip: int = 0, limit: int = 100) -> List:
-    """Get inspections with pagination"""
-    service = SafetyInspectionService(db)
-    inspections = service.get_inspections(skip, limit)
-    
-    # Convert to dict format
-    result = []
-    for inspection in inspections:
-        # Get location name
-        location = db.query(Location).filter(Location.location_id == inspection.location_id).first()
-        location_name = location.location_name if location else "Unknown"
-        
-        inspection_dict = {
-            "inspection_id": inspection.inspection_id,
-            "type": inspection.inspection_type,
-            "area": location_name,
-            "inspector": inspection.inspector_name,
-            "scheduled_date": inspection.inspection_date.isoformat() if inspection.inspection_date else None,
-            "completed_date": inspection.inspection_date.isoformat() if inspection.status == "Completed" else None,
-            "status": inspection.status,
-            "score": inspection.score,
-            "notes": inspection.notes,
-            "findings": []  # Can be extended later
-        }
-        result.append(inspection_dict)
-    
-    return result
+def _inspection_rows(db: Session, apply_filters, columns: Sequence) -> List:
+    """Select inspection rows for the given columns.
 
-def get_inspection_by_id(db: Session, inspection_id: int):
-    """Get a specific inspection by ID"""
-    service = SafetyInspectionService(db)
-    inspection = service.get_inspection(inspection_id)
-    
-    if not inspection:
+    A trailing Location.location_name is filled in from the process-wide
+    location cache; if any location is not cached the rows are re-selected
+    with a join and the cache is refreshed.
+    """
+    if columns[-1].key != "location_name":
+        return apply_filters(db.query(*columns)).all()
+
+    inspection_columns = columns[:-1]
+    location_id = SafetyInspection.location_id.label("row_location_id")
+    rows = apply_filters(db.query(*inspection_columns, location_id)).all()
+    names = location_names.lookup(db, {row.row_location_id for row in rows})
+    if names is not None:
+        return [(*row[:-1], names[row.row_location_id]) for row in rows]
+
+    generation = location_names.generation
+    rows = apply_filters(
+        db.query(*inspection_columns, Location.location_name, location_id)
+        .outerjoin(Location, Location.location_id == SafetyInspection.location_id)
+    ).all()
+    location_names.fill({
+        row.row_location_id: row.location_name for row in rows if row.location_name is not None
+    }, generation)
+    return [tuple(row[:-1]) for row in rows]
+
+def _area(location_name: Optional[str]) -> str:
+    return location_name if location_name is not None else "Unknown"
+
+def _completed_date(inspection_date, status: str):
+    return inspection_date if status == "Completed" else None
+
+# Fields over _INSPECTION_COLUMNS followed by the location name
+inspection_fields = FieldSet("inspection", (*_INSPECTION_COLUMNS, Location.location_name), {
+    "inspection_id": "inspection_id",
+    "type": "inspection_type",
+    "area": (_area, "location_name"),
+    "inspector": "inspector_name",
+    "scheduled_date": "inspection_date",
+    "completed_date": (_completed_date, "inspection_date", "status"),
+    "status": "status",
+    "score": "score",
+    "notes": "notes",
+    "findings": (list,)  # Can be extended later
+}, key="inspection_id")
+inspection_serializer = inspection_fields.serializer()
+
+def _with_location_name(db: Session, inspection: Row) -> tuple:
+    """The written inspection plus its location name, in inspection_serializer's column order"""
+    values = {**inspection._mapping, "location_name": _location_name(db, inspection.location_id)}
+    return tuple(values[column.key] for column in inspection_serializer.columns)
+
+def _location_name(db: Session, location_id: int) -> Optional[str]:
+    names = location_names.lookup(db, [location_id])
+    if names is not None:
+        return names[location_id]
+
+    generation = location_names.generation
+    location = db.query(Location).filter(Location.location_id == location_id).first()
+    if not location:
         return None
-    
-    # Get location name
-    location = db.query(Location).filter(Location.location_id == inspection.location_id).first()
-    location_name = location.location_name if location else "Unknown"
-    
-    return {
-        "inspection_id": inspection.inspection_id,
-        "type": inspection.inspection_type,
-        "area": location_name,
-        "inspector": inspection.inspector_name,
-        "scheduled_date": inspection.inspection_date.isoformat() if inspection.inspection_date else None,
-        "completed_date": inspection.inspection_date.isoformat() if inspection.status == "Completed" else None,
-        "status": inspection.status,
-        "score": inspection.score,
-        "notes": inspection.notes,
-        "findings": []
-    }
+    location_names.fill({location_id: location.location_name}, generation)
+    return location.location_name
+
+def _get_inspection_dict(db: Session, inspection_id: int, fields: Optional[Tuple[str, ...]] = None):
+    serializer = inspection_fields.serializer(fields)
+    rows = _inspection_rows(
+        db, lambda query: query.filter(SafetyInspection.inspection_id == inspection_id), serializer.columns
+    )
+    return serializer.to_dict(rows[0]) if rows else None
+
+def _inspection_page(
+    db: Session,
+    skip: int,
+    limit: int,
+    after_id: Optional[int],
+    fields: Optional[Tuple[str, ...]]
+) -> Tuple[RowSerializer, List]:
+    serializer = inspection_fields.serializer(fields)
+
+    def page(query):
+        query = query.order_by(SafetyInspection.inspection_id)
+        if after_id is not None:
+            return query.filter(SafetyInspection.inspection_id > after_id).limit(limit)
+        return query.offset(skip).limit(limit)
+
+    return serializer, _inspection_rows(db, page, serializer.columns)
+
+def get_inspections(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None
+) -> List:
+    """Get inspections with offset or cursor pagination, selecting only the requested fields"""
+    serializer, rows = _inspection_page(db, skip, limit, after_id, fields)
+    return serializer.to_list(rows)
+
+def get_inspection_columns(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None
+) -> Dict[str, List]:
+    """Get the same page as get_inspections as one list per field, for columnar responses"""
+    serializer, rows = _inspection_page(db, skip, limit, after_id, fields)
+    return serializer.to_columns(rows)
+
+def get_inspection_by_id(db: Session, inspection_id: int, fields: Optional[Tuple[str, ...]] = None):
+    """Get a specific inspection by ID"""
+    key = inspection_id if fields is None else (inspection_id, fields)
+    return inspection_cache.get_or_load(key, lambda: _get_inspection_dict(db, inspection_id, fields))
 
 def create_inspection(db: Session, inspection_data):
     """Create a new inspection"""
@@ -122,22 +225,7 @@ def create_inspection(db: Session, inspection_data):
     
     inspection = service.create_inspection(inspection_data)
     
-    # Get location name
-    location = db.query(Location).filter(Location.location_id == inspection.location_id).first()
-    location_name = location.location_name if location else "Unknown"
-    
-    return {
-        "inspection_id": inspection.inspection_id,
-        "type": inspection.inspection_type,
-        "area": location_name,
-        "inspector": inspection.inspector_name,
-        "scheduled_date": inspection.inspection_date.isoformat() if inspection.inspection_date else None,
-        "completed_date": None,
-        "status": inspection.status,
-        "score": inspection.score,
-        "notes": inspection.notes,
-        "findings": []
-    }
+    return inspection_serializer.to_dict(_with_location_name(db, inspection))
 
 def update_inspection(db: Session, inspection_id: int, inspection_data):
     """Update an existing inspection"""
@@ -149,25 +237,25 @@ def update_inspection(db: Session, inspection_id: int, inspection_data):
         inspection_data = SafetyInspectionUpdate(**inspection_data)
     
     inspection = service.update_inspection(inspection_id, inspection_data)
-    
-    # Get location name
-    location = db.query(Location).filter(Location.location_id == inspection.location_id).first()
-    location_name = location.location_name if location else "Unknown"
-    
-    return {
-        "inspection_id": inspection.inspection_id,
-        "type": inspection.inspection_type,
-        "area": location_name,
-        "inspector": inspection.inspector_name,
-        "scheduled_date": inspection.inspection_date.isoformat() if inspection.inspection_date else None,
-        "completed_date": inspection.inspection_date.isoformat() if inspection.status == "Completed" else None,
-        "status": inspection.status,
-        "score": inspection.score,
-        "notes": inspection.notes,
-        "findings": []
-    }
+    return inspection_serializer.to_dict(_with_location_name(db, inspection))
 
 def delete_inspection(db: Session, inspection_id: int) -> bool:
     """Delete an inspection"""
     service = SafetyInspectionService(db)
     return service.delete_inspection(inspection_id)
+
+def update_inspections(db: Session, inspection_ids: List[int], inspection_data) -> Dict:
+    """Apply the same changes to many inspections"""
+    service = SafetyInspectionService(db)
+    
+    # Convert dict to Pydantic model if needed
+    if isinstance(inspection_data, dict):
+        from ..schemas import SafetyInspectionUpdate
+        inspection_data = SafetyInspectionUpdate(**inspection_data)
+    
+    return service.update_inspections(inspection_ids, inspection_data)
+
+def delete_inspections(db: Session, inspection_ids: List[int]) -> Dict:
+    """Delete many inspections"""
+    service = SafetyInspectionService(db)
+    return service.delete_inspections(inspection_ids)
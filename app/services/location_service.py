@@ -1,21 +1,106 @@
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from fastapi import HTTPException
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+import time
+from threading import Lock
+from ..config import settings
 from ..models import Location
 from ..schemas import LocationCreate, LocationUpdate
+from .entity_cache import entity_cache
+from .serializers import FieldSet
+from .writes import (
+    batch_result,
+    delete_many_returning,
+    insert_returning,
+    update_many_returning,
+    update_returning
+)
+
+class LocationNameCache:
+    """Process-wide map of location_id to location_name.
+
+    Loaded from the locations table and kept current by LocationService
+    writes, so other services can resolve location names without a query.
+    Like EntityCache, writes bump a generation: names a reader SELECTed are
+    only stored if no write happened since it read `generation`, and the map
+    is reloaded after the cache TTL in case a write went around the service.
+    """
+    def __init__(self, ttl_seconds: float = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.cache_ttl_seconds
+        self._names: Dict[int, str] = {}
+        self._expires = 0.0
+        self._lock = Lock()
+        self.generation = 0
+
+    def load(self, db: Session) -> None:
+        generation = self.generation
+        rows = db.query(Location.location_id, Location.location_name).all()
+        with self._lock:
+            if generation == self.generation:
+                self._names = {row.location_id: row.location_name for row in rows}
+                self._expires = time.monotonic() + self.ttl_seconds
+
+    def lookup(self, db: Session, location_ids: Iterable[int]) -> Optional[Dict[int, str]]:
+        """Return names for all given ids, or None if any id is not cached"""
+        if time.monotonic() >= self._expires:
+            self.load(db)
+        names = self._names
+        result = {}
+        for location_id in location_ids:
+            if location_id not in names:
+                return None
+            result[location_id] = names[location_id]
+        return result
+
+    def fill(self, names: Dict[int, str], generation: int) -> None:
+        """Store names a reader SELECTed after reading `generation`, unless a write came in between"""
+        with self._lock:
+            if generation == self.generation:
+                self._names.update(names)
+
+    def set(self, location_id: int, location_name: str) -> None:
+        with self._lock:
+            self._names[location_id] = location_name
+            self.generation += 1
+
+    def update(self, names: Dict[int, str]) -> None:
+        with self._lock:
+            self._names.update(names)
+            self.generation += 1
+
+    def discard(self, location_id: int) -> None:
+        with self._lock:
+            self._names.pop(location_id, None)
+            self.generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._names = {}
+            self._expires = 0.0
+            self.generation += 1
+
+location_names = LocationNameCache()
+
+# Location payloads, keyed by location_id (and "all" for the full list)
+location_cache = entity_cache("locations", ["locations"])
+
+# Incidents and inspections reference locations without ON DELETE CASCADE,
+# so the foreign key rejects deleting a location they still point at
+_LOCATION_IN_USE = "Location has incidents or inspections"
 
 class LocationService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_location(self, location_data: LocationCreate) -> Location:
+    def create_location(self, location_data: LocationCreate) -> Row:
         try:
-            db_location = Location(**location_data.model_dump())
-            self.db.add(db_location)
+            # description, building and floor have no columns and are dropped
+            location = insert_returning(self.db, Location, location_data.model_dump(), Location.__table__.columns)
             self.db.commit()
-            self.db.refresh(db_location)
-            return db_location
+            location_names.set(location.location_id, location.location_name)
+            return location
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error creating location: {str(e)}")
@@ -26,72 +111,93 @@ class LocationService:
     def get_location(self, location_id: int) -> Optional[Location]:
         return self.db.query(Location).filter(Location.location_id == location_id).first()
 
-    def update_location(self, location_id: int, location_data: LocationUpdate) -> Location:
+    def update_location(self, location_id: int, location_data: LocationUpdate) -> Row:
         try:
-            db_location = self.get_location(location_id)
-            if not db_location:
-                raise HTTPException(status_code=404, detail="Location not found")
-
-            # Update fields
-            update_data = location_data.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_location, field, value)
-
+            location = update_returning(
+                self.db, Location, location_id,
+                location_data.model_dump(exclude_unset=True), Location.__table__.columns
+            )
             self.db.commit()
-            self.db.refresh(db_location)
-            return db_location
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error updating location: {str(e)}")
+        if location is None:
+            raise HTTPException(status_code=404, detail="Location not found")
+        location_names.set(location.location_id, location.location_name)
+        return location
 
     def delete_location(self, location_id: int) -> bool:
         try:
-            db_location = self.get_location(location_id)
-            if not db_location:
-                return False
-
-            self.db.delete(db_location)
+            deleted = delete_many_returning(self.db, Location, [location_id])
             self.db.commit()
-            return True
+            location_names.discard(location_id)
+            return bool(deleted)
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(status_code=409, detail=_LOCATION_IN_USE)
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error deleting location: {str(e)}")
 
+    def update_locations(self, location_ids: List[int], location_data: LocationUpdate) -> Dict:
+        """Apply the same changes to many locations with one UPDATE"""
+        try:
+            rows = update_many_returning(
+                self.db, Location, location_ids,
+                location_data.model_dump(exclude_unset=True), [Location.location_id, Location.location_name]
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error updating locations: {str(e)}")
+        location_names.update({row.location_id: row.location_name for row in rows})
+        return batch_result("updated", location_ids, [row.location_id for row in rows])
+
+    def delete_locations(self, location_ids: List[int]) -> Dict:
+        """Delete many locations with one DELETE"""
+        try:
+            deleted = delete_many_returning(self.db, Location, location_ids)
+            self.db.commit()
+            for location_id in deleted:
+                location_names.discard(location_id)
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(status_code=409, detail=_LOCATION_IN_USE)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error deleting locations: {str(e)}")
+        return batch_result("deleted", location_ids, deleted)
+
 # Simple service functions for backward compatibility
-def get_locations(db: Session) -> List:
-    """Get all locations"""
-    service = LocationService(db)
-    locations = service.get_locations()
-    
-    # Convert to dict format
-    result = []
-    for location in locations:
-        location_dict = {
-            "location_id": location.location_id,
-            "name": location.location_name,
-            "description": None,  # Not in database model
-            "building": None,     # Not in database model
-            "floor": None         # Not in database model
-        }
-        result.append(location_dict)
-    
-    return result
+def _not_in_model() -> None:
+    return None
+
+location_fields = FieldSet("location", Location.__table__.columns, {
+    "location_id": "location_id",
+    "name": "location_name",
+    "description": (_not_in_model,),  # Not in database model
+    "building": (_not_in_model,),     # Not in database model
+    "floor": (_not_in_model,)         # Not in database model
+}, key="location_id")
+location_serializer = location_fields.serializer()
+
+def get_locations(db: Session, fields: Optional[Tuple[str, ...]] = None) -> List:
+    """Get all locations, narrowed to some fields"""
+    serializer = location_fields.serializer(fields)
+    return location_cache.get_or_load(
+        "all" if fields is None else ("all", fields),
+        lambda: serializer.to_list(db.query(*serializer.columns).all())
+    )
 
-def get_location_by_id(db: Session, location_id: int):
+def get_location_by_id(db: Session, location_id: int, fields: Optional[Tuple[str, ...]] = None):
     """Get a specific location by ID"""
-    service = LocationService(db)
-    location = service.get_location(location_id)
+    serializer = location_fields.serializer(fields)
     
-    if not location:
-        return None
+    def load():
+        location = db.query(*serializer.columns).filter(Location.location_id == location_id).first()
+        return serializer.to_dict(location) if location else None
     
-    return {
-        "location_id": location.location_id,
-        "name": location.location_name,
-        "description": None,  # Not in database model
-        "building": None,     # Not in database model
-        "floor": None         # Not in database model
-    }
+    return location_cache.get_or_load(location_id if fields is None else (location_id, fields), load)
 
 def create_location(db: Session, location_data):
     """Create a new location"""
@@ -103,14 +209,7 @@ def create_location(db: Session, location_data):
         location_data = LocationCreate(**location_data)
     
     location = service.create_location(location_data)
-    
-    return {
-        "location_id": location.location_id,
-        "name": location.location_name,
-        "description": None,  # Not in database model
-        "building": None,     # Not in database model
-        "floor": None         # Not in database model
-    }
+    return location_serializer.to_dict(location)
 
 def update_location(db: Session, location_id: int, location_data):
     """Update an existing location"""
@@ -122,16 +221,25 @@ def update_location(db: Session, location_id: int, location_data):
         location_data = LocationUpdate(**location_data)
     
     location = service.update_location(location_id, location_data)
-    
-    return {
-        "location_id": location.location_id,
-        "name": location.location_name,
-        "description": None,  # Not in database model
-        "building": None,     # Not in database model
-        "floor": None         # Not in database model
-    }
+    return location_serializer.to_dict(location)
 
 def delete_location(db: Session, location_id: int) -> bool:
     """Delete a location"""
     service = LocationService(db)
     return service.delete_location(location_id)
+
+def update_locations(db: Session, location_ids: List[int], location_data) -> Dict:
+    """Apply the same changes to many locations"""
+    service = LocationService(db)
+    
+    # Convert dict to Pydantic model if needed
+    if isinstance(location_data, dict):
+        from ..schemas import LocationUpdate
+        location_data = LocationUpdate(**location_data)
+    
+    return service.update_locations(location_ids, location_data)
+
+def delete_locations(db: Session, location_ids: List[int]) -> Dict:
+    """Delete many locations"""
+    service = LocationService(db)
+    return service.delete_locations(location_ids)
@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+from fastapi import HTTPException, Response
+from typing import Any, Callable, List, Optional, Sequence
+
+def encode_cursor(last_key: Any) -> str:
+    payload = json.dumps({"after": last_key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+def _cursor_payload(cursor: str) -> Any:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded))["after"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Return the last primary key seen by the client, or None for the first page"""
+    if not cursor:
+        return None
+    last_id = _cursor_payload(cursor)
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+def decode_key_cursor(cursor: Optional[str], parsers: Sequence[Callable]) -> Optional[List]:
+    """Return the last sort key seen by the client, one value per parser, or None for the first page"""
+    if not cursor:
+        return None
+    last_key = _cursor_payload(cursor)
+    if not isinstance(last_key, list) or len(last_key) != len(parsers):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        return [parse(value) for parse, value in zip(parsers, last_key)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def set_page_headers(response: Response, page: List, limit: int, key: Callable, total: int) -> None:
+    """Expose the total row count and, for full pages, the cursor of the next page"""
+    response.headers["X-Total-Count"] = str(total)
+    if len(page) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(key(page[-1]))
@@ -0,0 +1,323 @@
+import importlib
+from datetime import date
+from fastapi import HTTPException
+from sqlalchemy import Integer, cast, func, literal_column, select
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional, Sequence, Tuple
+from ..models import Employee, PPECompliance
+from .entity_cache import entity_cache
+from .versions import get_versions
+
+# NumPy is optional: it is only imported when analytics are requested, and a
+# missing package answers 501 rather than failing startup
+PPE_ANALYTICS_TABLES = ("ppe_compliance", "employees")
+PPE_ITEMS = {
+    "helmet": PPECompliance.helmet_compliance,
+    "safety_glasses": PPECompliance.safety_glasses_compliance,
+    "gloves": PPECompliance.gloves_compliance,
+    "safety_shoes": PPECompliance.safety_shoes_compliance,
+    "vest": PPECompliance.vest_compliance,
+}
+PPE_PERIODS = ("day", "week", "month")
+DEFAULT_PERCENTILES = (25.0, 50.0, 75.0)
+
+LOAD_BATCH_SIZE = 100000
+
+# Days since 1970-01-01 of the assessment date, NULL when there is none
+_ASSESSMENT_DAY = cast(func.julianday(PPECompliance.assessment_date) - literal_column("2440587.5"), Integer)
+
+# Largest per-group histogram (groups x distinct values) _group_percentiles counts into
+_HISTOGRAM_CELLS = 1 << 20
+
+# Loaded arrays by table versions. Only the latest versions are kept; an entry
+# cannot go stale, so it is kept for a day rather than reloaded every CACHE_TTL_SECONDS
+_columns_cache = entity_cache("ppe_analytics_columns", PPE_ANALYTICS_TABLES, max_entries=1, ttl_seconds=86400)
+# Computed summaries by (table versions, parameters)
+ppe_analytics_cache = entity_cache("ppe_analytics", PPE_ANALYTICS_TABLES)
+
+def _numpy():
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        raise HTTPException(status_code=501, detail="PPE analytics require the optional numpy package")
+
+class PPEColumns:
+    """Every PPE compliance assessment loaded into arrays, one element (or row) per assessment.
+
+    Item percentages are split into `scores`, with 0 for NULL, and the
+    `assessed` mask, so that sums need no NaN handling; assessment days are
+    NaN for NULL. Employees are replaced by their position in `employees` and
+    departments by their position in `departments`; assessments whose
+    employee is missing, or who has no department, point one past the end.
+    """
+    def __init__(self, numpy, values, employees: Sequence[Tuple]):
+        items = values[:, 2:2 + len(PPE_ITEMS)]
+        self.day = values[:, 1]
+        self.assessed = ~numpy.isnan(items)
+        self.scores = numpy.where(self.assessed, items, 0.0)
+        self.violations = numpy.nan_to_num(values[:, -1])
+        # Per assessment totals over its items, for the per-employee means
+        self.score_total = self.scores.sum(axis=1)
+        self.assessed_items = self.assessed.sum(axis=1)
+
+        self.employees = [
+            (employee_id, f"{first_name} {last_name}", department)
+            for employee_id, first_name, last_name, department in employees
+        ]
+        self.departments = sorted({department for *_, department in employees if department is not None})
+        codes = {department: code for code, department in enumerate(self.departments)}
+        employee_departments = numpy.array(
+            [codes.get(department, len(self.departments)) for *_, department in employees] + [len(self.departments)],
+            dtype=numpy.int64
+        )
+        employee_ids = numpy.array([employee_id for employee_id, *_ in employees], dtype=numpy.int64)
+        assessed_ids = values[:, 0].astype(numpy.int64)
+        index = numpy.searchsorted(employee_ids, assessed_ids)
+        found = index < len(employee_ids)
+        found[found] = employee_ids[index[found]] == assessed_ids[found]
+        self.employee = numpy.where(found, index, len(employee_ids))
+        self.department = employee_departments[self.employee]
+
+def _load_columns(db: Session, numpy) -> PPEColumns:
+    """Fetch the analytics columns straight from the DBAPI cursor in batches of plain tuples"""
+    statement = select(PPECompliance.employee_id, _ASSESSMENT_DAY, *PPE_ITEMS.values(), PPECompliance.violations)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(str(statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})))
+        batches = []
+        while True:
+            rows = cursor.fetchmany(LOAD_BATCH_SIZE)
+            if not rows:
+                break
+            # None becomes NaN in a float array
+            batches.append(numpy.array(rows, dtype=numpy.float64))
+    finally:
+        cursor.close()
+    values = numpy.concatenate(batches) if batches else numpy.empty((0, len(PPE_ITEMS) + 3))
+
+    employees = db.query(Employee.employee_id, Employee.first_name, Employee.last_name, Employee.department).order_by(
+        Employee.employee_id
+    ).all()
+    return PPEColumns(numpy, values, employees)
+
+def _group_sums(numpy, groups, count: int, scores, assessed):
+    """Sum and number of assessed values of each item per group, from one bincount over all items"""
+    width = scores.shape[1]
+    cells = (groups[:, None] * width + numpy.arange(width)).ravel()
+    sums = numpy.bincount(cells, scores.ravel(), count * width).reshape(count, width)
+    counts = numpy.bincount(cells, assessed.ravel(), count * width).reshape(count, width)
+    return sums, counts
+
+def _means(numpy, sums, counts):
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+def _group_percentiles(numpy, groups, count: int, scores, assessed, percentiles: Sequence[float]):
+    """Percentiles of each item per group as [group, item, percentile], interpolated like
+    numpy.percentile, with one extra group at the end covering every assessment; NaN for
+    groups with no values.
+
+    The items hold integers over a small range (percentages), so each one is
+    counted into a per-group histogram with one bincount and the percentiles
+    are read off its running totals, without sorting. Wider ranges fall back
+    to one sort of an integer (group, value) key.
+    """
+    fractions = numpy.asarray(percentiles, dtype=numpy.float64) / 100
+    result = numpy.full((count + 1, scores.shape[1], len(fractions)), numpy.nan)
+    for column in range(scores.shape[1]):
+        present = assessed[:, column]
+        if not present.any():
+            continue
+        values = scores[present, column].astype(numpy.int64)
+        value_groups = groups[present]
+        low = values.min()
+        span = int(values.max() - low) + 1
+        keys = value_groups * span + (values - low)
+
+        sizes = numpy.bincount(value_groups, minlength=count)
+        sizes = numpy.append(sizes, len(values))
+        positions = (numpy.maximum(sizes, 1)[:, None] - 1) * fractions
+        ranks = numpy.stack([numpy.floor(positions), numpy.ceil(positions)]).astype(numpy.int64)
+        if count * span <= _HISTOGRAM_CELLS:
+            histogram = numpy.bincount(keys, minlength=count * span).reshape(count, span)
+            totals = numpy.vstack([histogram, histogram.sum(axis=0)]).cumsum(axis=1)
+            # The value at a rank is the first one whose running total exceeds it. Offsetting
+            # each group's totals past the previous group's makes them one sorted array
+            offsets = numpy.arange(count + 1)[:, None]
+            found = numpy.searchsorted((totals + offsets * (len(keys) + 1)).ravel(), ranks + offsets * (len(keys) + 1), "right")
+            lower, upper = numpy.minimum(found - offsets * span, span - 1) + low
+        else:
+            ordered = numpy.sort(keys) % span + low
+            starts = (numpy.cumsum(sizes[:-1]) - sizes[:-1])[:, None]
+            lower, upper = ordered[numpy.minimum(starts + ranks[:, :-1], len(ordered) - 1)]
+            overall = numpy.sort(values)[ranks[:, -1]]
+            lower, upper = numpy.vstack([lower, overall[:1]]), numpy.vstack([upper, overall[1:]])
+        interpolated = lower + (upper - lower) * (positions - ranks[0])
+        result[:, column] = numpy.where(sizes[:, None] > 0, interpolated, numpy.nan)
+    return result
+
+def _period_index(numpy, days, period: str):
+    """Number of the day, week (starting Monday) or month since 1970 of each day number"""
+    days = days.astype(numpy.int64)
+    if period == "week":
+        # 1970-01-01 was a Thursday
+        return (days + 3) // 7
+    if period == "month":
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype(numpy.int64)
+    return days
+
+def _period_start(numpy, index: int, period: str) -> str:
+    if period == "week":
+        return str(numpy.datetime64(index * 7 - 3, "D"))
+    if period == "month":
+        return str(numpy.datetime64(index, "M").astype("datetime64[D]"))
+    return str(numpy.datetime64(index, "D"))
+
+def _number(value) -> Optional[float]:
+    value = float(value)
+    return None if value != value else round(value, 2)
+
+def _percentile_key(percentile: float) -> str:
+    return f"p{percentile:g}"
+
+def _summarize(
+    numpy,
+    columns: PPEColumns,
+    period: str,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    departments: Optional[Sequence[str]],
+    percentiles: Sequence[float],
+    limit: int
+) -> Dict[str, Any]:
+    selected = None
+    epoch = date(1970, 1, 1)
+
+    def narrow(condition):
+        return condition if selected is None else selected & condition
+
+    if date_from is not None:
+        selected = narrow(columns.day >= (date_from - epoch).days)
+    if date_to is not None:
+        selected = narrow(columns.day < (date_to - epoch).days)
+    if departments:
+        codes = [code for code, department in enumerate(columns.departments) if department in departments]
+        selected = narrow(numpy.isin(columns.department, codes))
+
+    def pick(array):
+        return array if selected is None else array[selected]
+
+    scores = pick(columns.scores)
+    assessed = pick(columns.assessed)
+    day = pick(columns.day)
+    violations = pick(columns.violations)
+    department = pick(columns.department)
+    employee = pick(columns.employee)
+    names = list(PPE_ITEMS)
+
+    def item_stats(means, points) -> Dict[str, Dict]:
+        return {
+            name: {"mean": _number(means[column]), **{
+                _percentile_key(percentile): _number(points[column, number])
+                for number, percentile in enumerate(percentiles)
+            }}
+            for column, name in enumerate(names)
+        }
+
+    # Per department, with the group after the last department holding assessments without one,
+    # and overall as the sum over departments
+    group_count = len(columns.departments) + 1
+    sizes = numpy.bincount(department, minlength=group_count)
+    violation_totals = numpy.bincount(department, violations, group_count)
+    sums, counts = _group_sums(numpy, department, group_count, scores, assessed)
+    means = _means(numpy, sums, counts)
+    overall_means = _means(numpy, sums.sum(axis=0), counts.sum(axis=0))
+    points = _group_percentiles(numpy, department, group_count, scores, assessed, percentiles)
+
+    department_names = [*columns.departments, None]
+    by_department = [
+        {
+            "department": department_names[code],
+            "assessments": int(sizes[code]),
+            "items": item_stats(means[code], points[code]),
+            "violations": {"total": int(violation_totals[code]), "mean": _number(violation_totals[code] / sizes[code])},
+        }
+        for code in numpy.flatnonzero(sizes)
+    ]
+
+    # Period over period: each bucket's item means against the previous bucket with assessments
+    dated = ~numpy.isnan(day)
+    periods = _period_index(numpy, day[dated], period)
+    first = periods.min() if len(periods) else 0
+    bucket_sizes = numpy.bincount(periods - first)
+    buckets = numpy.flatnonzero(bucket_sizes)
+    bucket_means = _means(numpy, *_group_sums(numpy, periods - first, len(bucket_sizes), scores[dated], assessed[dated]))[buckets]
+    bucket_deltas = numpy.full_like(bucket_means, numpy.nan)
+    bucket_deltas[1:] = bucket_means[1:] - bucket_means[:-1]
+    by_period = [
+        {
+            "bucket": _period_start(numpy, int(first + bucket), period),
+            "assessments": int(bucket_sizes[bucket]),
+            "means": {name: _number(bucket_means[number, column]) for column, name in enumerate(names)},
+            "deltas": {name: _number(bucket_deltas[number, column]) for column, name in enumerate(names)},
+        }
+        for number, bucket in enumerate(buckets)
+    ]
+
+    # Worst offenders: lowest mean compliance over every assessed item, then most violations
+    employee_count = len(columns.employees) + 1
+    assessed_items = numpy.bincount(employee, pick(columns.assessed_items), employee_count)
+    employee_means = _means(numpy, numpy.bincount(employee, pick(columns.score_total), employee_count), assessed_items)
+    employee_violations = numpy.bincount(employee, violations, employee_count)
+    employee_sizes = numpy.bincount(employee, minlength=employee_count)
+    candidates = numpy.flatnonzero(assessed_items[:-1] > 0)
+    order = numpy.lexsort((-employee_violations[candidates], employee_means[candidates]))
+    worst = []
+    for index in candidates[order[:limit]]:
+        employee_id, name, employee_department = columns.employees[index]
+        worst.append({
+            "employee_id": employee_id,
+            "employee": name,
+            "department": employee_department,
+            "assessments": int(employee_sizes[index]),
+            "mean_compliance": _number(employee_means[index]),
+            "violations": int(employee_violations[index]),
+        })
+
+    return {
+        "assessments": int(len(scores)),
+        "percentiles": list(percentiles),
+        "overall": {
+            "items": item_stats(overall_means, points[-1]),
+            "violations": {"total": int(violations.sum()), "mean": _number(violations.mean()) if len(violations) else None},
+        },
+        "departments": by_department,
+        "periods": by_period,
+        "worst_offenders": worst,
+    }
+
+def get_ppe_compliance_analytics(
+    db: Session,
+    period: str = "month",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    department: Optional[Sequence[str]] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """PPE compliance means and percentiles per item, overall and per department, item means per
+    period with the change from the previous period, and the employees with the lowest compliance.
+
+    The assessments are loaded into NumPy arrays once per write version of the
+    PPE compliance and employee tables; every summary is then a vectorized
+    pass over those arrays, cached under the same versions.
+    """
+    numpy = _numpy()
+    versions = tuple(sorted(get_versions(db, PPE_ANALYTICS_TABLES).items()))
+    key = (versions, period, date_from, date_to, tuple(sorted(department or ())), tuple(percentiles), limit)
+
+    def load():
+        columns = _columns_cache.get_or_load(versions, lambda: _load_columns(db, numpy))
+        return _summarize(numpy, columns, period, date_from, date_to, department, percentiles, limit)
+
+    return ppe_analytics_cache.get_or_load(key, load)
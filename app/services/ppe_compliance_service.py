@@ -1,21 +1,85 @@
+from sqlalchemy import select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from ..models import PPECompliance, Employee
 from ..schemas import PPEComplianceCreate, PPEComplianceUpdate
+from .entity_cache import entity_cache
+from .serializers import FieldSet, RowSerializer
+from .writes import (
+    batch_result,
+    delete_many_returning,
+    insert_returning,
+    update_many_returning,
+    update_returning,
+    written_column
+)
+
+# PPE compliance payloads by ppe_id; they embed the employee name and department
+ppe_compliance_cache = entity_cache("ppe_compliance", ["ppe_compliance", "employees"])
+
+_PPE_COMPLIANCE_COLUMNS = (
+    PPECompliance.ppe_id,
+    PPECompliance.assessment_date,
+    PPECompliance.helmet_compliance,
+    PPECompliance.safety_glasses_compliance,
+    PPECompliance.gloves_compliance,
+    PPECompliance.safety_shoes_compliance,
+    PPECompliance.vest_compliance,
+    PPECompliance.violations,
+    PPECompliance.status,
+    PPECompliance.assessor_name
+)
+_EMPLOYEE_COLUMNS = (Employee.employee_id, Employee.first_name, Employee.last_name, Employee.department)
+
+# The same response columns for INSERT/UPDATE ... RETURNING, which cannot join;
+# employee columns come from correlated subqueries instead
+_PPE_COMPLIANCE_RETURNING = (
+    *_PPE_COMPLIANCE_COLUMNS,
+    *(
+        select(column)
+        .where(Employee.employee_id == written_column(PPECompliance.employee_id))
+        .scalar_subquery()
+        .label(column.key)
+        for column in _EMPLOYEE_COLUMNS
+    )
+)
+
+def _employee_display(employee_id, first_name, last_name) -> str:
+    # employee_id is NULL when the outer join found no matching employee
+    return f"{first_name} {last_name}" if employee_id is not None else "Unknown"
+
+def _employee_department(employee_id, department):
+    return department if employee_id is not None else "Unknown"
+
+# Fields over the joined SELECT; the RETURNING columns have the same order
+ppe_compliance_fields = FieldSet("PPE compliance", (*_PPE_COMPLIANCE_COLUMNS, *_EMPLOYEE_COLUMNS), {
+    "ppe_id": "ppe_id",
+    "employee": (_employee_display, "employee_id", "first_name", "last_name"),
+    "department": (_employee_department, "employee_id", "department"),
+    "assessment_date": "assessment_date",
+    "helmet_compliance": "helmet_compliance",
+    "safety_glasses_compliance": "safety_glasses_compliance",
+    "gloves_compliance": "gloves_compliance",
+    "safety_shoes_compliance": "safety_shoes_compliance",
+    "vest_compliance": "vest_compliance",
+    "violations": "violations",
+    "status": "status",
+    "assessor": "assessor_name"
+}, key="ppe_id")
+ppe_compliance_serializer = ppe_compliance_fields.serializer()
 
 class PPEComplianceService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_ppe_compliance(self, ppe_data: PPEComplianceCreate) -> PPECompliance:
+    def create_ppe_compliance(self, ppe_data: PPEComplianceCreate) -> Row:
         try:
-            db_ppe = PPECompliance(**ppe_data.model_dump())
-            self.db.add(db_ppe)
+            record = insert_returning(self.db, PPECompliance, ppe_data.model_dump(), _PPE_COMPLIANCE_RETURNING)
             self.db.commit()
-            self.db.refresh(db_ppe)
-            return db_ppe
+            return record
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error creating PPE compliance record: {str(e)}")
@@ -26,94 +90,105 @@ class PPEComplianceService:
     def get_ppe_compliance(self, ppe_id: int) -> Optional[PPECompliance]:
         return self.db.query(PPECompliance).filter(PPECompliance.ppe_id == ppe_id).first()
 
-    def update_ppe_compliance(self, ppe_id: int, ppe_data: PPEComplianceUpdate) -> PPECompliance:
+    def update_ppe_compliance(self, ppe_id: int, ppe_data: PPEComplianceUpdate) -> Row:
         try:
-            db_ppe = self.get_ppe_compliance(ppe_id)
-            if not db_ppe:
-                raise HTTPException(status_code=404, detail="PPE compliance record not found")
-
-            # Update fields
-            update_data = ppe_data.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_ppe, field, value)
-
+            record = update_returning(
+                self.db, PPECompliance, ppe_id, ppe_data.model_dump(exclude_unset=True), _PPE_COMPLIANCE_RETURNING
+            )
             self.db.commit()
-            self.db.refresh(db_ppe)
-            return db_ppe
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error updating PPE compliance record: {str(e)}")
+        if record is None:
+            raise HTTPException(status_code=404, detail="PPE compliance record not found")
+        return record
 
     def delete_ppe_compliance(self, ppe_id: int) -> bool:
         try:
-            db_ppe = self.get_ppe_compliance(ppe_id)
-            if not db_ppe:
-                return False
-
-            self.db.delete(db_ppe)
+            deleted = delete_many_returning(self.db, PPECompliance, [ppe_id])
             self.db.commit()
-            return True
+            return bool(deleted)
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error deleting PPE compliance record: {str(e)}")
 
+    def update_ppe_compliance_records(self, ppe_ids: List[int], ppe_data: PPEComplianceUpdate) -> Dict:
+        """Apply the same changes to many PPE compliance records with one UPDATE"""
+        try:
+            rows = update_many_returning(
+                self.db, PPECompliance, ppe_ids,
+                ppe_data.model_dump(exclude_unset=True), [PPECompliance.ppe_id]
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error updating PPE compliance records: {str(e)}")
+        return batch_result("updated", ppe_ids, [row.ppe_id for row in rows])
+
+    def delete_ppe_compliance_records(self, ppe_ids: List[int]) -> Dict:
+        """Delete many PPE compliance records with one DELETE"""
+        try:
+            deleted = delete_many_returning(self.db, PPECompliance, ppe_ids)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error deleting PPE compliance records: {str(e)}")
+        return batch_result("deleted", ppe_ids, deleted)
+
 # Simple service functions for backward compatibility
-def get_ppe_compliance_records(db: Session, skip: int = 0, limit: int = 100) -> List:
-    """Get PPE compliance records with pagination"""
-    service = PPEComplianceService(db)
-    records = service.get_ppe_compliance_records(skip, limit)
-    
-    # Convert to dict format
-    result = []
-    for record in records:
-        # Get employee name
-        employee = db.query(Employee).filter(Employee.employee_id == record.employee_id).first()
-        employee_name = f"{employee.first_name} {employee.last_name}" if employee else "Unknown"
-        
-        record_dict = {
-            "ppe_id": record.ppe_id,
-            "employee": employee_name,
-            "department": employee.department if employee else "Unknown",
-            "assessment_date": record.assessment_date.isoformat() if record.assessment_date else None,
-            "helmet_compliance": record.helmet_compliance,
-            "safety_glasses_compliance": record.safety_glasses_compliance,
-            "gloves_compliance": record.gloves_compliance,
-            "safety_shoes_compliance": record.safety_shoes_compliance,
-            "vest_compliance": record.vest_compliance,
-            "violations": record.violations,
-            "status": record.status,
-            "assessor": record.assessor_name
-        }
-        result.append(record_dict)
-    
-    return result
+def _ppe_compliance_rows(db: Session, columns: Sequence):
+    """Select PPE compliance columns, joined to the owning employee only when employee columns are requested"""
+    query = db.query(*columns)
+    if any(getattr(column, "class_", None) is Employee for column in columns):
+        query = query.outerjoin(Employee, Employee.employee_id == PPECompliance.employee_id)
+    return query
 
-def get_ppe_compliance_by_id(db: Session, ppe_id: int):
+def _get_ppe_compliance_dict(db: Session, ppe_id: int, fields: Optional[Tuple[str, ...]] = None):
+    serializer = ppe_compliance_fields.serializer(fields)
+    row = _ppe_compliance_rows(db, serializer.columns).filter(PPECompliance.ppe_id == ppe_id).first()
+    return serializer.to_dict(row) if row else None
+
+def _ppe_compliance_page(
+    db: Session,
+    skip: int,
+    limit: int,
+    after_id: Optional[int],
+    fields: Optional[Tuple[str, ...]]
+) -> Tuple[RowSerializer, List]:
+    serializer = ppe_compliance_fields.serializer(fields)
+    query = _ppe_compliance_rows(db, serializer.columns).order_by(PPECompliance.ppe_id)
+    if after_id is not None:
+        query = query.filter(PPECompliance.ppe_id > after_id)
+    else:
+        query = query.offset(skip)
+    return serializer, query.limit(limit).all()
+
+def get_ppe_compliance_records(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None
+) -> List:
+    """Get PPE compliance records with offset or cursor pagination, selecting only the requested fields"""
+    serializer, rows = _ppe_compliance_page(db, skip, limit, after_id, fields)
+    return serializer.to_list(rows)
+
+def get_ppe_compliance_columns(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None
+) -> Dict[str, List]:
+    """Get the same page as get_ppe_compliance_records as one list per field, for columnar responses"""
+    serializer, rows = _ppe_compliance_page(db, skip, limit, after_id, fields)
+    return serializer.to_columns(rows)
+
+def get_ppe_compliance_by_id(db: Session, ppe_id: int, fields: Optional[Tuple[str, ...]] = None):
     """Get a specific PPE compliance record by ID"""
-    service = PPEComplianceService(db)
-    record = service.get_ppe_compliance(ppe_id)
-    
-    if not record:
-        return None
-    
-    # Get employee name
-    employee = db.query(Employee).filter(Employee.employee_id == record.employee_id).first()
-    employee_name = f"{employee.first_name} {employee.last_name}" if employee else "Unknown"
-    
-    return {
-        "ppe_id": record.ppe_id,
-        "employee": employee_name,
-        "department": employee.department if employee else "Unknown",
-        "assessment_date": record.assessment_date.isoformat() if record.assessment_date else None,
-        "helmet_compliance": record.helmet_compliance,
-        "safety_glasses_compliance": record.safety_glasses_compliance,
-        "gloves_compliance": record.gloves_compliance,
-        "safety_shoes_compliance": record.safety_shoes_compliance,
-        "vest_compliance": record.vest_compliance,
-        "violations": record.violations,
-        "status": record.status,
-        "assessor": record.assessor_name
-    }
+    key = ppe_id if fields is None else (ppe_id, fields)
+    return ppe_compliance_cache.get_or_load(key, lambda: _get_ppe_compliance_dict(db, ppe_id, fields))
 
 def create_ppe_compliance(db: Session, ppe_data):
     """Create a new PPE compliance record"""
@@ -125,25 +200,7 @@ def create_ppe_compliance(db: Session, ppe_data):
         ppe_data = PPEComplianceCreate(**ppe_data)
     
     record = service.create_ppe_compliance(ppe_data)
-    
-    # Get employee name
-    employee = db.query(Employee).filter(Employee.employee_id == record.employee_id).first()
-    employee_name = f"{employee.first_name} {employee.last_name}" if employee else "Unknown"
-    
-    return {
-        "ppe_id": record.ppe_id,
-        "employee": employee_name,
-        "department": employee.department if employee else "Unknown",
-        "assessment_date": record.assessment_date.isoformat() if record.assessment_date else None,
-        "helmet_compliance": record.helmet_compliance,
-        "safety_glasses_compliance": record.safety_glasses_compliance,
-        "gloves_compliance": record.gloves_compliance,
-        "safety_shoes_compliance": record.safety_shoes_compliance,
-        "vest_compliance": record.vest_compliance,
-        "violations": record.violations,
-        "status": record.status,
-        "assessor": record.assessor_name
-    }
+    return ppe_compliance_serializer.to_dict(record)
 
 def update_ppe_compliance(db: Session, ppe_id: int, ppe_data):
     """Update an existing PPE compliance record"""
@@ -155,27 +212,25 @@ def update_ppe_compliance(db: Session, ppe_id: int, ppe_data):
         ppe_data = PPEComplianceUpdate(**ppe_data)
     
     record = service.update_ppe_compliance(ppe_id, ppe_data)
-    
-    # Get employee name
-    employee = db.query(Employee).filter(Employee.employee_id == record.employee_id).first()
-    employee_name = f"{employee.first_name} {employee.last_name}" if employee else "Unknown"
-    
-    return {
-        "ppe_id": record.ppe_id,
-        "employee": employee_name,
-        "department": employee.department if employee else "Unknown",
-        "assessment_date": record.assessment_date.isoformat() if record.assessment_date else None,
-        "helmet_compliance": record.helmet_compliance,
-        "safety_glasses_compliance": record.safety_glasses_compliance,
-        "gloves_compliance": record.gloves_compliance,
-        "safety_shoes_compliance": record.safety_shoes_compliance,
-        "vest_compliance": record.vest_compliance,
-        "violations": record.violations,
-        "status": record.status,
-        "assessor": record.assessor_name
-    }
+    return ppe_compliance_serializer.to_dict(record)
 
 def delete_ppe_compliance(db: Session, ppe_id: int) -> bool:
     """Delete a PPE compliance record"""
     service = PPEComplianceService(db)
     return service.delete_ppe_compliance(ppe_id)
+
+def update_ppe_compliance_records(db: Session, ppe_ids: List[int], ppe_data) -> Dict:
+    """Apply the same changes to many PPE compliance records"""
+    service = PPEComplianceService(db)
+    
+    # Convert dict to Pydantic model if needed
+    if isinstance(ppe_data, dict):
+        from ..schemas import PPEComplianceUpdate
+        ppe_data = PPEComplianceUpdate(**ppe_data)
+    
+    return service.update_ppe_compliance_records(ppe_ids, ppe_data)
+
+def delete_ppe_compliance_records(db: Session, ppe_ids: List[int]) -> Dict:
+    """Delete many PPE compliance records"""
+    service = PPEComplianceService(db)
+    return service.delete_ppe_compliance_records(ppe_ids)
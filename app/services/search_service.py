@@ -0,0 +1,72 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from typing import List, Optional
+
+# entity type -> (FTS table, column shown as the result title)
+SEARCH_ENTITIES = {
+    "incident": ("safety_incidents_fts", "incident_type"),
+    "inspection": ("safety_inspections_fts", "inspection_type"),
+}
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+SNIPPET_TOKENS = 16
+
+def build_match_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching all terms.
+
+    Every term is quoted so FTS5 operators and punctuation in user input are
+    matched literally; a trailing * on a term keeps prefix matching.
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', '""')
+        if term:
+            terms.append(f'"{term}"*' if prefix else f'"{term}"')
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain at least one term")
+    return " ".join(terms)
+
+def search(
+    db: Session,
+    query: str,
+    entity_types: Optional[List[str]] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> List[dict]:
+    """Rank incidents and inspections matching the query by BM25"""
+    entity_types = entity_types or list(SEARCH_ENTITIES)
+    unknown = [entity_type for entity_type in entity_types if entity_type not in SEARCH_ENTITIES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search type: {', '.join(unknown)}")
+
+    selects = [
+        f"SELECT '{entity_type}' AS entity_type, rowid AS entity_id, "
+        f"{fts}.{title} AS title, "
+        f"snippet({fts}, -1, :start, :end, '…', :tokens) AS snippet, "
+        f"bm25({fts}) AS rank "
+        f"FROM {fts} WHERE {fts} MATCH :match"
+        for entity_type, (fts, title) in SEARCH_ENTITIES.items() if entity_type in entity_types
+    ]
+    statement = text(" UNION ALL ".join(selects) + " ORDER BY rank LIMIT :limit OFFSET :skip")
+    rows = db.execute(statement, {
+        "match": build_match_query(query),
+        "start": HIGHLIGHT_START,
+        "end": HIGHLIGHT_END,
+        "tokens": SNIPPET_TOKENS,
+        "limit": limit,
+        "skip": skip,
+    }).all()
+
+    return [
+        {
+            "entity_type": row.entity_type,
+            "id": row.entity_id,
+            "title": row.title,
+            "snippet": row.snippet,
+            "rank": row.rank
+        }
+        for row in rows
+    ]
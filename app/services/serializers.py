@@ -0,0 +1,126 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
+import orjson
+from fastapi import HTTPException, Response
+
+# A response field is either the key of a SELECTed column, or a function
+# followed by the keys of the columns it is called with
+FieldSource = Union[str, Tuple]
+
+class FastJSONResponse(Response):
+    """JSON response rendered by orjson; bytes are sent as they are.
+
+    orjson writes dates, times and datetimes in ISO 8601 itself, the same
+    text jsonable_encoder produces with .isoformat().
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def json_response(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """Return content without FastAPI's jsonable_encoder pass.
+
+    Headers that dependencies or the route set on the injected `response`
+    (ETag, X-Total-Count, X-Next-Cursor) are carried over.
+    """
+    result = FastJSONResponse(content)
+    if response is not None:
+        result.headers.raw.extend(response.headers.raw)
+    return result
+
+def employee_display_name(first_name, last_name, employee_name) -> str:
+    """An employee's name as responses show it: first and last name when both are set"""
+    return f"{first_name} {last_name}" if first_name and last_name else employee_name
+
+class RowSerializer:
+    """Turns SELECTed rows of one entity into response dicts.
+
+    The mapping from row positions to response fields is compiled once into
+    a function that builds the dict with a single literal, so serializing a
+    row costs one call and no per-field Python logic beyond the declared
+    functions.
+    """
+    def __init__(self, columns: Sequence, fields: Dict[str, FieldSource]):
+        positions = {column.key: index for index, column in enumerate(columns)}
+        namespace: Dict[str, Callable] = {}
+        items = []
+        self._sources = []
+        for number, (key, source) in enumerate(fields.items()):
+            if isinstance(source, str):
+                items.append(f"{key!r}: row[{positions[source]}]")
+                self._sources.append((key, None, (positions[source],)))
+            else:
+                function, *arguments = source
+                namespace[f"_f{number}"] = function
+                call_arguments = ", ".join(f"row[{positions[argument]}]" for argument in arguments)
+                items.append(f"{key!r}: _f{number}({call_arguments})")
+                self._sources.append((key, function, tuple(positions[argument] for argument in arguments)))
+        exec(f"def to_dict(row):\n    return {{{', '.join(items)}}}\n", namespace)
+        self.columns = tuple(columns)
+        self.fields = tuple(fields)
+        self.to_dict: Callable[[Sequence], Dict] = namespace["to_dict"]
+
+    def to_list(self, rows: Iterable[Sequence]) -> list:
+        to_dict = self.to_dict
+        return [to_dict(row) for row in rows]
+
+    def to_columns(self, rows: Sequence[Sequence]) -> Dict[str, list]:
+        """Serialize rows into one list per response field, without building per-row dicts.
+
+        The rows are transposed once; plain fields reuse the column values and
+        computed fields map their function over the columns they read.
+        """
+        values = list(zip(*rows)) if rows else [()] * len(self.columns)
+        columns = {}
+        for key, function, positions in self._sources:
+            if function is None:
+                columns[key] = list(values[positions[0]])
+            elif positions:
+                columns[key] = list(map(function, *(values[position] for position in positions)))
+            else:
+                columns[key] = [function() for _ in rows]
+        return columns
+
+    def dumps(self, rows: Iterable[Sequence]) -> bytes:
+        """Serialize rows straight to a JSON array"""
+        return orjson.dumps(self.to_list(rows))
+
+def _source_columns(source: FieldSource) -> Tuple[str, ...]:
+    return (source,) if isinstance(source, str) else tuple(source[1:])
+
+class FieldSet:
+    """The response fields of one entity, for fields= projections.
+
+    `columns` lists every column a field can be built from, in SELECT order.
+    A projection selects only the columns its fields read and is serialized
+    by a RowSerializer compiled for that column list. `key` is always
+    included so that cursors and cache keys keep working.
+    """
+    def __init__(self, entity: str, columns: Sequence, fields: Dict[str, FieldSource], key: str):
+        self.entity = entity
+        self.columns = tuple(columns)
+        self.fields = dict(fields)
+        self.key = key
+        self.serializer: Callable[..., RowSerializer] = lru_cache(maxsize=256)(self._compile)
+
+    def parse(self, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """Parse a comma-separated fields= value into declaration order; None means every field"""
+        if not fields:
+            return None
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = sorted(requested - self.fields.keys())
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown {self.entity} fields: {', '.join(unknown)}")
+        requested.add(self.key)
+        return tuple(field for field in self.fields if field in requested)
+
+    def _compile(self, fields: Optional[Tuple[str, ...]] = None) -> RowSerializer:
+        fields = fields or tuple(self.fields)
+        keys = {key for field in fields for key in _source_columns(self.fields[field])}
+        return RowSerializer(
+            [column for column in self.columns if column.key in keys],
+            {field: self.fields[field] for field in fields}
+        )
@@ -0,0 +1,135 @@
+from datetime import date, timedelta
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Sequence
+from ..models import Employee, EmployeeTrainingExpiry, SafetyTraining, TrainingParticipant
+from .serializers import RowSerializer, employee_display_name
+from .versions import bump_versions
+
+# Training columns the expiries are computed from; updates that change one of them refresh the participants
+EXPIRY_ATTRS = ("training_type", "expiry_date")
+
+_EXPIRY_COLUMNS = (
+    EmployeeTrainingExpiry.employee_id,
+    Employee.first_name,
+    Employee.last_name,
+    Employee.employee_name,
+    Employee.department,
+    EmployeeTrainingExpiry.training_type,
+    EmployeeTrainingExpiry.training_id,
+    EmployeeTrainingExpiry.expiry_date
+)
+expiry_serializer = RowSerializer(_EXPIRY_COLUMNS, {
+    "employee_id": "employee_id",
+    "employee": (employee_display_name, "first_name", "last_name", "employee_name"),
+    "department": "department",
+    "training_type": "training_type",
+    "training_id": "training_id",
+    "expiry_date": "expiry_date"
+})
+
+# Page order, also the next-page cursor; matches ix_employee_training_expiries_expiry_date
+_EXPIRY_ORDER = (EmployeeTrainingExpiry.expiry_date, EmployeeTrainingExpiry.employee_id, EmployeeTrainingExpiry.training_type)
+EXPIRY_CURSOR_PARSERS = [date.fromisoformat, int, str]
+
+def expiry_cursor_key(expiry: Dict) -> List:
+    return [expiry["expiry_date"].isoformat(), expiry["employee_id"], expiry["training_type"]]
+
+def _latest_expiries():
+    # SQLite fills the bare training_id column from the row that has the max() expiry_date
+    return (
+        select(
+            TrainingParticipant.employee_id,
+            SafetyTraining.training_type,
+            func.max(SafetyTraining.expiry_date),
+            SafetyTraining.training_id
+        )
+        .join(SafetyTraining, SafetyTraining.training_id == TrainingParticipant.training_id)
+        .where(SafetyTraining.expiry_date.isnot(None))
+        .group_by(TrainingParticipant.employee_id, SafetyTraining.training_type)
+    )
+
+_REFRESHED_COLUMNS = ["employee_id", "training_type", "expiry_date", "training_id"]
+
+def refresh_training_expiries(db: Session, employee_ids) -> None:
+    """Recompute the expiry rows of the given employees (ids, or a SELECT of ids) with one
+    DELETE and one INSERT ... SELECT; trainings without an expiry_date are ignored"""
+    if isinstance(employee_ids, (list, set, tuple)):
+        employee_ids = list(employee_ids)
+        if not employee_ids:
+            return
+    db.execute(delete(EmployeeTrainingExpiry).where(EmployeeTrainingExpiry.employee_id.in_(employee_ids)))
+    db.execute(
+        insert(EmployeeTrainingExpiry).from_select(
+            _REFRESHED_COLUMNS, _latest_expiries().where(TrainingParticipant.employee_id.in_(employee_ids))
+        )
+    )
+    bump_versions(db, [EmployeeTrainingExpiry.__tablename__])
+
+def training_participant_ids(training_ids: Iterable[int]):
+    """SELECT of the employees enrolled in any of the trainings, for refresh_training_expiries"""
+    return select(TrainingParticipant.employee_id).where(TrainingParticipant.training_id.in_(list(training_ids)))
+
+def rebuild_training_expiries(db: Session) -> int:
+    """Recompute every expiry row from the trainings and their participants; returns the number written"""
+    db.execute(delete(EmployeeTrainingExpiry))
+    written = db.execute(insert(EmployeeTrainingExpiry).from_select(_REFRESHED_COLUMNS, _latest_expiries())).rowcount
+    bump_versions(db, [EmployeeTrainingExpiry.__tablename__])
+    db.commit()
+    return written
+
+def _expiring_query(
+    db: Session,
+    columns: Sequence,
+    days: int,
+    include_expired: bool,
+    department: Optional[Sequence[str]],
+    training_type: Optional[Sequence[str]],
+    today: Optional[date]
+):
+    today = today or date.today()
+    query = db.query(*columns).select_from(EmployeeTrainingExpiry).filter(
+        EmployeeTrainingExpiry.expiry_date <= today + timedelta(days=days)
+    )
+    if not include_expired:
+        query = query.filter(EmployeeTrainingExpiry.expiry_date >= today)
+    if training_type:
+        query = query.filter(EmployeeTrainingExpiry.training_type.in_(training_type))
+    if department or any(getattr(column, "class_", None) is Employee for column in columns):
+        query = query.join(Employee, Employee.employee_id == EmployeeTrainingExpiry.employee_id)
+    if department:
+        query = query.filter(Employee.department.in_(department))
+    return query
+
+def get_expiring_trainings(
+    db: Session,
+    days: int = 30,
+    include_expired: bool = False,
+    department: Optional[Sequence[str]] = None,
+    training_type: Optional[Sequence[str]] = None,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[List] = None,
+    today: Optional[date] = None
+) -> List[Dict]:
+    """Employees whose latest training of a type expires within `days` from today, soonest first,
+    with offset or cursor pagination"""
+    query = _expiring_query(db, _EXPIRY_COLUMNS, days, include_expired, department, training_type, today)
+    query = query.order_by(*_EXPIRY_ORDER)
+    if after is not None:
+        query = query.filter(tuple_(*_EXPIRY_ORDER) > tuple_(*after))
+    else:
+        query = query.offset(skip)
+    return expiry_serializer.to_list(query.limit(limit).all())
+
+def count_expiring_trainings(
+    db: Session,
+    days: int = 30,
+    include_expired: bool = False,
+    department: Optional[Sequence[str]] = None,
+    training_type: Optional[Sequence[str]] = None,
+    today: Optional[date] = None
+) -> int:
+    return _expiring_query(
+        db, [func.count()], days, include_expired, department, training_type, today
+    ).scalar()
@@ -1,128 +1,233 @@
+from sqlalchemy import delete, exists, func, insert, literal, select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from ..models import SafetyTraining, TrainingParticipant, Employee
 from ..schemas import SafetyTrainingCreate, SafetyTrainingUpdate
+from .entity_cache import entity_cache
+from .serializers import FieldSet
+from .training_expiries import EXPIRY_ATTRS, refresh_training_expiries, training_participant_ids
+from .versions import bump_versions
+from .writes import (
+    batch_result,
+    delete_many_returning,
+    insert_returning,
+    update_many_returning,
+    update_returning,
+    written_column
+)
+
+# Training payloads by training_id; they embed the participant count
+training_cache = entity_cache("trainings", ["safety_trainings", "training_participants"])
+
+# Correlated count so that only the trainings on the requested page are counted
+_participants_count = select(func.count(TrainingParticipant.id)).where(
+    TrainingParticipant.training_id == written_column(SafetyTraining.training_id)
+).scalar_subquery()
+
+_TRAINING_COLUMNS = (
+    SafetyTraining.training_id,
+    SafetyTraining.training_type,
+    SafetyTraining.completion_date,
+    SafetyTraining.expiry_date,
+    SafetyTraining.trainer_name,
+    SafetyTraining.created_at,
+    _participants_count.label("participants_count")
+)
+
+training_fields = FieldSet("training", _TRAINING_COLUMNS, {
+    "training_id": "training_id",
+    "training_type": "training_type",
+    "completion_date": "completion_date",
+    "expiry_date": "expiry_date",
+    "trainer_name": "trainer_name",
+    "created_at": "created_at",
+    "participants_count": "participants_count"
+}, key="training_id")
+training_serializer = training_fields.serializer()
 
 class SafetyTrainingService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_training(self, training_data: SafetyTrainingCreate) -> SafetyTraining:
+    def create_training(self, training_data: SafetyTrainingCreate) -> Row:
         try:
             # Create the training session
             training_dict = training_data.model_dump()
-            participants = training_dict.pop('participants', [])
+            # Drop repeated employee ids; (training_id, employee_id) is unique
+            participants = list(dict.fromkeys(training_dict.pop('participants', None) or []))
+            if participants:
+                self._validate_employee_ids(participants)
             
-            db_training = SafetyTraining(**training_dict)
-            self.db.add(db_training)
+            # Participants go in the same transaction, after the training_id is known;
+            # the returned participants_count is read before they are inserted
+            training = insert_returning(self.db, SafetyTraining, training_dict, _TRAINING_COLUMNS)
+            if participants:
+                self._insert_participants(training.training_id, participants)
+                refresh_training_expiries(self.db, participants)
             self.db.commit()
-            self.db.refresh(db_training)
 
-            # Add participants if provided
-            if participants:
-                for employee_id in participants:
-                    participant = TrainingParticipant(
-                        training_id=db_training.training_id,
-                        employee_id=employee_id
-                    )
-                    self.db.add(participant)
-                self.db.commit()
-
-            return db_training
+            return training
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error creating training: {str(e)}")
 
+    def _validate_employee_ids(self, employee_ids: List[int]) -> None:
+        """Reject the request unless every employee id exists, checked with one IN query"""
+        found = set(self.db.scalars(select(Employee.employee_id).where(Employee.employee_id.in_(employee_ids))))
+        unknown = sorted(set(employee_ids) - found)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown employee ids: {', '.join(map(str, unknown))}")
+
+    def _insert_participants(self, training_id: int, employee_ids: List[int]) -> int:
+        """Enrol employees with one INSERT ... SELECT that skips existing participants"""
+        already_enrolled = exists().where(
+            TrainingParticipant.training_id == training_id,
+            TrainingParticipant.employee_id == Employee.employee_id
+        )
+        result = self.db.execute(
+            insert(TrainingParticipant).from_select(
+                ["training_id", "employee_id"],
+                select(literal(training_id), Employee.employee_id).where(
+                    Employee.employee_id.in_(employee_ids), ~already_enrolled
+                )
+            )
+        )
+        if result.rowcount:
+            # Core writes bypass the flush hooks
+            bump_versions(self.db, [TrainingParticipant.__tablename__])
+        return result.rowcount
+
+    def _require_training(self, training_id: int) -> None:
+        if not self.db.scalar(select(SafetyTraining.training_id).where(SafetyTraining.training_id == training_id)):
+            raise HTTPException(status_code=404, detail="Training not found")
+
+    def enroll_participants(self, training_id: int, employee_ids: List[int]) -> int:
+        """Enrol employees in a training; returns how many were not already enrolled"""
+        self._require_training(training_id)
+        employee_ids = list(dict.fromkeys(employee_ids))
+        self._validate_employee_ids(employee_ids)
+        try:
+            enrolled = self._insert_participants(training_id, employee_ids)
+            if enrolled:
+                refresh_training_expiries(self.db, employee_ids)
+            self.db.commit()
+            return enrolled
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error enrolling participants: {str(e)}")
+
+    def unenroll_participants(self, training_id: int, employee_ids: List[int]) -> int:
+        """Remove employees from a training with one DELETE; returns how many were enrolled"""
+        self._require_training(training_id)
+        try:
+            result = self.db.execute(
+                delete(TrainingParticipant).where(
+                    TrainingParticipant.training_id == training_id,
+                    TrainingParticipant.employee_id.in_(employee_ids)
+                )
+            )
+            if result.rowcount:
+                bump_versions(self.db, [TrainingParticipant.__tablename__])
+                refresh_training_expiries(self.db, employee_ids)
+            self.db.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error removing participants: {str(e)}")
+
     def get_trainings(self, skip: int = 0, limit: int = 100) -> List[SafetyTraining]:
         return self.db.query(SafetyTraining).offset(skip).limit(limit).all()
 
     def get_training(self, training_id: int) -> Optional[SafetyTraining]:
         return self.db.query(SafetyTraining).filter(SafetyTraining.training_id == training_id).first()
 
-    def update_training(self, training_id: int, training_data: SafetyTrainingUpdate) -> SafetyTraining:
-        try:
-            db_training = self.get_training(training_id)
-            if not db_training:
-                raise HTTPException(status_code=404, detail="Training not found")
+    def _refresh_expiries(self, training_ids: List[int], values: Dict) -> None:
+        # Participants of trainings whose type or expiry changed
+        if values.keys() & set(EXPIRY_ATTRS):
+            refresh_training_expiries(self.db, training_participant_ids(training_ids))
 
-            # Update fields
-            update_data = training_data.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_training, field, value)
+    def _enrolled_employee_ids(self, training_ids: List[int]) -> List[int]:
+        return list(self.db.scalars(training_participant_ids(training_ids).distinct()))
 
+    def update_training(self, training_id: int, training_data: SafetyTrainingUpdate) -> Row:
+        try:
+            values = training_data.model_dump(exclude_unset=True)
+            training = update_returning(self.db, SafetyTraining, training_id, values, _TRAINING_COLUMNS)
+            if training is not None:
+                self._refresh_expiries([training_id], values)
             self.db.commit()
-            self.db.refresh(db_training)
-            return db_training
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error updating training: {str(e)}")
+        if training is None:
+            raise HTTPException(status_code=404, detail="Training not found")
+        return training
 
     def delete_training(self, training_id: int) -> bool:
         try:
-            db_training = self.get_training(training_id)
-            if not db_training:
-                return False
-
-            # Delete participants first
-            self.db.query(TrainingParticipant).filter(
-                TrainingParticipant.training_id == training_id
-            ).delete()
-            
-            # Delete training
-            self.db.delete(db_training)
+            # Participants go with the training (ON DELETE CASCADE), so collect them first
+            employee_ids = self._enrolled_employee_ids([training_id])
+            deleted = delete_many_returning(self.db, SafetyTraining, [training_id])
+            refresh_training_expiries(self.db, employee_ids)
             self.db.commit()
-            return True
+            return bool(deleted)
         except SQLAlchemyError as e:
             self.db.rollback()
             raise HTTPException(status_code=400, detail=f"Error deleting training: {str(e)}")
 
+    def update_trainings(self, training_ids: List[int], training_data: SafetyTrainingUpdate) -> Dict:
+        """Apply the same changes to many trainings with one UPDATE"""
+        try:
+            values = training_data.model_dump(exclude_unset=True)
+            rows = update_many_returning(self.db, SafetyTraining, training_ids, values, [SafetyTraining.training_id])
+            if rows:
+                self._refresh_expiries([row.training_id for row in rows], values)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error updating trainings: {str(e)}")
+        return batch_result("updated", training_ids, [row.training_id for row in rows])
+
+    def delete_trainings(self, training_ids: List[int]) -> Dict:
+        """Delete many trainings with one DELETE"""
+        try:
+            employee_ids = self._enrolled_employee_ids(training_ids)
+            deleted = delete_many_returning(self.db, SafetyTraining, training_ids)
+            refresh_training_expiries(self.db, employee_ids)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=f"Error deleting trainings: {str(e)}")
+        return batch_result("deleted", training_ids, deleted)
+
 # Simple service functions for backward compatibility
-def get_trainings(db: Session, skip: int = 0, limit: int = 100) -> List:
-    service = SafetyTrainingService(db)
-    trainings = service.get_trainings(skip, limit)
-    
-    # Convert to dict format with participant count
-    result = []
-    for training in trainings:
-        participant_count = db.query(TrainingParticipant).filter(
-            TrainingParticipant.training_id == training.training_id
-        ).count()
-        
-        training_dict = {
-            "training_id": training.training_id,
-            "training_type": training.training_type,
-            "completion_date": training.completion_date.isoformat() if training.completion_date else None,
-            "expiry_date": training.expiry_date.isoformat() if training.expiry_date else None,
-            "trainer_name": training.trainer_name,
-            "created_at": training.created_at.isoformat() if training.created_at else None,
-            "participants_count": participant_count
-        }
-        result.append(training_dict)
-    
-    return result
+def _get_training_dict(db: Session, training_id: int, fields: Optional[Tuple[str, ...]] = None):
+    serializer = training_fields.serializer(fields)
+    row = db.query(*serializer.columns).filter(SafetyTraining.training_id == training_id).first()
+    return serializer.to_dict(row) if row else None
 
-def get_training_by_id(db: Session, training_id: int):
-    service = SafetyTrainingService(db)
-    training = service.get_training(training_id)
-    
-    if not training:
-        return None
-    
-    participant_count = db.query(TrainingParticipant).filter(
-        TrainingParticipant.training_id == training.training_id
-    ).count()
-    
-    return {
-        "training_id": training.training_id,
-        "training_type": training.training_type,
-        "completion_date": training.completion_date.isoformat() if training.completion_date else None,
-        "expiry_date": training.expiry_date.isoformat() if training.expiry_date else None,
-        "trainer_name": training.trainer_name,
-        "created_at": training.created_at.isoformat() if training.created_at else None,
-        "participants_count": participant_count
-    }
+def get_trainings(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None
+) -> List:
+    """Get trainings with offset or cursor pagination, selecting only the requested fields"""
+    serializer = training_fields.serializer(fields)
+    query = db.query(*serializer.columns).order_by(SafetyTraining.training_id)
+    if after_id is not None:
+        query = query.filter(SafetyTraining.training_id > after_id)
+    else:
+        query = query.offset(skip)
+    return serializer.to_list(query.limit(limit).all())
+
+def get_training_by_id(db: Session, training_id: int, fields: Optional[Tuple[str, ...]] = None):
+    key = training_id if fields is None else (training_id, fields)
+    return training_cache.get_or_load(key, lambda: _get_training_dict(db, training_id, fields))
 
 def create_training(db: Session, training_data):
     service = SafetyTrainingService(db)
@@ -134,15 +239,10 @@ def create_training(db: Session, training_data):
     
     training = service.create_training(training_data)
     
-    return {
-        "training_id": training.training_id,
-        "training_type": training.training_type,
-        "completion_date": training.completion_date.isoformat() if training.completion_date else None,
-        "expiry_date": training.expiry_date.isoformat() if training.expiry_date else None,
-        "trainer_name": training.trainer_name,
-        "created_at": training.created_at.isoformat() if training.created_at else None,
-        "participants_count": 0
-    }
+    # Participants were validated and deduplicated, so all of them were enrolled
+    training_dict = training_serializer.to_dict(training)
+    training_dict["participants_count"] = len(set(training_data.participants or []))
+    return training_dict
 
 def update_training(db: Session, training_id: int, training_data):
     service = SafetyTrainingService(db)
@@ -153,21 +253,47 @@ def update_training(db: Session, training_id: int, training_data):
         training_data = SafetyTrainingUpdate(**training_data)
     
     training = service.update_training(training_id, training_data)
-    
-    participant_count = db.query(TrainingParticipant).filter(
-        TrainingParticipant.training_id == training.training_id
-    ).count()
-    
-    return {
-        "training_id": training.training_id,
-        "training_type": training.training_type,
-        "completion_date": training.completion_date.isoformat() if training.completion_date else None,
-        "expiry_date": training.expiry_date.isoformat() if training.expiry_date else None,
-        "trainer_name": training.trainer_name,
-        "created_at": training.created_at.isoformat() if training.created_at else None,
-        "participants_count": participant_count
-    }
+    return training_serializer.to_dict(training)
 
 def delete_training(db: Session, training_id: int) -> bool:
     service = SafetyTrainingService(db)
     return service.delete_training(training_id)
+
+def _enrollment_result(db: Session, training_id: int, requested: int, changed: int, key: str) -> dict:
+    training = _get_training_dict(db, training_id)
+    return {
+        "training_id": training_id,
+        key: changed,
+        "unchanged": requested - changed,
+        "participants_count": training["participants_count"]
+    }
+
+def enroll_participants(db: Session, training_id: int, employee_ids: List[int]) -> dict:
+    """Enrol employees in a training session, skipping those already enrolled"""
+    service = SafetyTrainingService(db)
+    employee_ids = list(dict.fromkeys(employee_ids))
+    enrolled = service.enroll_participants(training_id, employee_ids)
+    return _enrollment_result(db, training_id, len(employee_ids), enrolled, "enrolled")
+
+def unenroll_participants(db: Session, training_id: int, employee_ids: List[int]) -> dict:
+    """Remove employees from a training session"""
+    service = SafetyTrainingService(db)
+    employee_ids = list(dict.fromkeys(employee_ids))
+    removed = service.unenroll_participants(training_id, employee_ids)
+    return _enrollment_result(db, training_id, len(employee_ids), removed, "removed")
+
+def update_trainings(db: Session, training_ids: List[int], training_data) -> Dict:
+    """Apply the same changes to many trainings"""
+    service = SafetyTrainingService(db)
+    
+    # Convert dict to Pydantic model if needed
+    if isinstance(training_data, dict):
+        from ..schemas import SafetyTrainingUpdate
+        training_data = SafetyTrainingUpdate(**training_data)
+    
+    return service.update_trainings(training_ids, training_data)
+
+def delete_trainings(db: Session, training_ids: List[int]) -> Dict:
+    """Delete many trainings"""
+    service = SafetyTrainingService(db)
+    return service.delete_trainings(training_ids)
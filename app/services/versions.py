@@ -0,0 +1,69 @@
+import hashlib
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from fastapi import Depends, HTTPException, Request, Response
+from typing import Callable, Dict, Iterable
+from ..database import get_db
+from ..models import EntityCounter
+from .columnar import columnar_format
+
+# Table write versions share the entity_counters table with the row counters
+VERSION_PREFIX = "version:"
+
+# Tables written in the session's current transaction, read by the entity cache on commit
+WRITTEN_TABLES_KEY = "written_tables"
+
+def bump_versions(session: Session, tables: Iterable[str]) -> None:
+    """Increment the write version of each table, creating it on first write"""
+    tables = set(tables)
+    session.info.setdefault(WRITTEN_TABLES_KEY, set()).update(tables)
+    connection = session.connection()
+    for table in tables:
+        statement = sqlite_insert(EntityCounter).values(name=VERSION_PREFIX + table, count=1)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[EntityCounter.name],
+            set_={"count": EntityCounter.count + 1}
+        ))
+
+def get_versions(db: Session, tables: Iterable[str]) -> Dict[str, int]:
+    """Current write version per table; tables never written report 0"""
+    tables = list(tables)
+    rows = db.execute(
+        select(EntityCounter.name, EntityCounter.count)
+        .where(EntityCounter.name.in_([VERSION_PREFIX + table for table in tables]))
+    ).all()
+    versions = {name[len(VERSION_PREFIX):]: count for name, count in rows}
+    return {table: versions.get(table, 0) for table in tables}
+
+@event.listens_for(Session, "after_flush")
+def _track_versions(session: Session, flush_context) -> None:
+    tables = {obj.__table__.name for obj in (*session.new, *session.deleted)}
+    tables.update(obj.__table__.name for obj in session.dirty if session.is_modified(obj))
+    tables.discard(EntityCounter.__tablename__)
+    if tables:
+        bump_versions(session, tables)
+
+def conditional_get(*tables: str) -> Callable:
+    """Dependency answering If-None-Match with 304 while none of the tables have changed.
+
+    The weak ETag covers the request path and query string, the columnar
+    format negotiated from Accept (if any) and the write versions of every
+    table the response is built from.
+    """
+    def check(request: Request, response: Response, db: Session = Depends(get_db)) -> None:
+        versions = get_versions(db, tables)
+        variant = f"{request.url.path}?{request.url.query}|{sorted(versions.items())}"
+        file_format = columnar_format(request)
+        if file_format is not None:
+            variant += f"|{file_format}"
+        digest = hashlib.sha1(variant.encode()).hexdigest()
+        etag = f'W/"{digest}"'
+
+        if_none_match = request.headers.get("if-none-match", "")
+        candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+
+    return check
@@ -0,0 +1,146 @@
+from sqlalchemy import delete, inspect, insert, literal_column, or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from .counters import adjust_for_changes, adjust_for_rows, counter_attrs, has_counters
+from .versions import bump_versions
+
+# INSERT/UPDATE/DELETE ... RETURNING write path (SQLite 3.35+). The response
+# columns come back from the write itself, so there is no refresh or
+# follow-up lookup. Statements run as plain Core writes and apply counters
+# and table versions through adjust_for_rows / adjust_for_changes.
+
+def written_column(attribute):
+    """Reference a column of the row being written from a subquery in RETURNING.
+
+    The SQLite compiler renders RETURNING without table names and does not
+    correlate subqueries to the written table, so the column is spelled out
+    in full. It works the same inside an ordinary SELECT of that table.
+    """
+    column = attribute.expression
+    return literal_column(f"{column.table.name}.{column.name}")
+
+def _column_values(model, values: Dict) -> Dict:
+    """Drop schema fields that have no column on the model"""
+    columns = model.__table__.c
+    return {field: value for field, value in values.items() if field in columns}
+
+def _returning_columns(model, columns: Sequence) -> List:
+    """The requested columns plus any column the model's counters read"""
+    keys = {column.key for column in columns}
+    return [*columns, *(getattr(model, attr) for attr in sorted(counter_attrs(model)) if attr not in keys)]
+
+def _primary_key(model):
+    return inspect(model).primary_key[0]
+
+def batch_result(action: str, keys: Iterable, written: Iterable) -> Dict:
+    """Summary of a batch write: how many rows it changed and which ids matched no row"""
+    written = set(written)
+    return {action: len(written), "not_found": sorted(set(keys) - written)}
+
+def insert_returning(db: Session, model, values: Dict, columns: Sequence) -> Row:
+    """Insert one row and read the given columns back from the same statement"""
+    row = db.execute(
+        insert(model).values(**_column_values(model, values)).returning(*_returning_columns(model, columns))
+    ).one()
+    adjust_for_rows(db, model, [row._mapping])
+    return row
+
+def update_many_returning(db: Session, model, keys: Iterable, values: Dict, columns: Sequence) -> List[Row]:
+    """Apply the same values to every row with one of the primary keys in a single
+    UPDATE ... WHERE key IN (...), reading the given columns back from it.
+
+    Keys with no row are skipped. Updating a column that a counter reads costs
+    one extra SELECT for the previous values.
+    """
+    primary_key = _primary_key(model)
+    keys = list(keys)
+    values = _column_values(model, values)
+    if not values:
+        return db.execute(select(*columns).where(primary_key.in_(keys))).all()
+
+    before = None
+    tracked = counter_attrs(model)
+    if tracked & values.keys():
+        before = db.execute(
+            select(*(getattr(model, attr) for attr in sorted(tracked))).where(primary_key.in_(keys))
+        ).all()
+        if not before:
+            return []
+
+    rows = db.execute(
+        update(model)
+        .where(primary_key.in_(keys))
+        .values(**values)
+        .returning(*_returning_columns(model, columns))
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not rows:
+        return rows
+    if before is not None:
+        adjust_for_changes(db, model, [row._mapping for row in before], [row._mapping for row in rows])
+    else:
+        bump_versions(db, [model.__table__.name])
+    return rows
+
+def update_returning(db: Session, model, key, values: Dict, columns: Sequence) -> Optional[Row]:
+    """Update one row by primary key and read the given columns back from the same statement.
+
+    Returns None when no row has that key.
+    """
+    rows = update_many_returning(db, model, [key], values, columns)
+    return rows[0] if rows else None
+
+def _cascaded_models(model) -> List:
+    """Mapped classes whose rows the database deletes along with rows of the model"""
+    table = model.__table__
+    return [
+        mapper.class_ for mapper in inspect(model).registry.mappers
+        if any(fk.ondelete == "CASCADE" and fk.column.table is table for fk in mapper.local_table.foreign_keys)
+    ]
+
+def _cascaded_rows(db: Session, model, condition) -> List[Tuple[type, Optional[List[Row]]]]:
+    """The rows ON DELETE CASCADE removes along with the rows of the model matching condition,
+    per descendant model, read before the parent DELETE.
+
+    Only models with counters are SELECTed, for the columns their counters
+    read; the others are listed with None so that their version is bumped.
+    """
+    table = model.__table__
+    cascaded = []
+    for child in _cascaded_models(model):
+        child_condition = or_(*(
+            fk.parent.in_(select(fk.column).where(condition))
+            for fk in child.__table__.foreign_keys if fk.ondelete == "CASCADE" and fk.column.table is table
+        ))
+        rows = None
+        if has_counters(child):
+            rows = db.execute(select(*_returning_columns(child, [_primary_key(child)])).where(child_condition)).all()
+        cascaded.append((child, rows))
+        cascaded.extend(_cascaded_rows(db, child, child_condition))
+    return cascaded
+
+def delete_many_returning(db: Session, model, keys: Iterable) -> List:
+    """Delete every row with one of the primary keys in a single DELETE ... WHERE key IN (...).
+
+    Returns the keys that were deleted. Child rows go through ON DELETE CASCADE;
+    those of tables with counters are SELECTed first and subtracted like the
+    deleted rows, so no counter needs a reseed.
+    """
+    primary_key = _primary_key(model)
+    condition = primary_key.in_(list(keys))
+    cascaded = _cascaded_rows(db, model, condition)
+    rows = db.execute(
+        delete(model)
+        .where(condition)
+        .returning(*_returning_columns(model, [primary_key]))
+        .execution_options(synchronize_session=False)
+    ).all()
+    if rows:
+        adjust_for_rows(db, model, [row._mapping for row in rows], sign=-1)
+        for child, child_rows in cascaded:
+            if child_rows is None:
+                bump_versions(db, [child.__table__.name])
+            else:
+                adjust_for_rows(db, child, [row._mapping for row in child_rows], sign=-1)
+    return [row[0] for row in rows]
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Cost of planning recurring inspections with the schedule generator.
+
+Fills a scratch database with locations, gives every location a daily, a
+weekly and a monthly inspection schedule, then times the call behind
+POST /api/v1/inspections/schedules/generate:
+
+  generate   one INSERT ... SELECT of every inspection in the window
+  rerun      the same call again; every inspection exists, nothing is inserted
+
+    python benchmark_inspection_schedules.py [--locations 300] [--days 365]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--locations", type=int, default=300)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+
+    from sqlalchemy import text
+    from app.database import engine, SessionLocal
+    from app.models import Base
+    from app.services.inspection_schedule_service import InspectionScheduleService
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO locations (location_id, location_name) "
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :locations) "
+            "SELECT i, 'Benchmark Location ' || i FROM n"
+        ), {"locations": args.locations})
+        for frequency in ("daily", "weekly", "monthly"):
+            connection.execute(text(
+                "INSERT INTO inspection_schedules (location_id, inspection_type, frequency, interval, start_date) "
+                "SELECT location_id, :inspection_type, :frequency, 1, '2024-01-01' FROM locations"
+            ), {"inspection_type": f"Benchmark {frequency} check", "frequency": frequency})
+
+    db = SessionLocal()
+    service = InspectionScheduleService(db)
+    for name in ("generate", "rerun"):
+        start = time.perf_counter()
+        generated = service.generate_inspections(date(2025, 1, 1), args.days)
+        print(f"{name:<10}{time.perf_counter() - start:>10.3f}s{generated:>10} inspections")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+PPE compliance analytics cost over a large assessment table.
+
+Fills a scratch database with random assessments spread over employees in
+several departments, then times the three stages of a request to
+/api/v1/analytics/ppe-compliance:
+
+  load       SELECT every assessment into NumPy arrays (once per table version)
+  summary    the vectorized pass: department and overall means and
+             percentiles, period deltas and worst offenders
+  cached     the same request again, answered from the analytics cache
+
+Requires numpy.
+
+    python benchmark_ppe_analytics.py [--rows 2000000] [--employees 5000] [--departments 25]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--employees", type=int, default=5000)
+    parser.add_argument("--departments", type=int, default=25)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+
+    import numpy
+    from sqlalchemy import text
+    from app.database import engine, SessionLocal
+    from app.models import Base
+    from app.services.ppe_analytics import DEFAULT_PERCENTILES, _load_columns, _summarize, get_ppe_compliance_analytics
+
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO employees (employee_id, employee_code, employee_name, first_name, last_name, department) "
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :employees) "
+            "SELECT i, 'B' || i, 'Benchmark ' || i, 'Benchmark', i, 'Department ' || (i % :departments) FROM n"
+        ), {"employees": args.employees, "departments": args.departments})
+        # About one in ten glasses scores is missing, as on assessments that skip an item
+        connection.execute(text(
+            "INSERT INTO ppe_compliance (employee_id, assessment_date, helmet_compliance, safety_glasses_compliance, "
+            "gloves_compliance, safety_shoes_compliance, vest_compliance, violations, status) "
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows) "
+            "SELECT 1 + abs(random()) % :employees, date('2024-01-01', '+' || (abs(random()) % 730) || ' days'), "
+            "abs(random()) % 101, CASE WHEN i % 10 = 0 THEN NULL ELSE abs(random()) % 101 END, "
+            "abs(random()) % 101, abs(random()) % 101, abs(random()) % 101, abs(random()) % 5, 'Compliant' FROM n"
+        ), {"rows": args.rows, "employees": args.employees})
+    print(f"seeded {args.rows} assessments in {time.perf_counter() - start:.1f}s")
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    columns = _load_columns(db, numpy)
+    print(f"{'load':<10}{time.perf_counter() - start:>10.3f}s")
+    start = time.perf_counter()
+    _summarize(numpy, columns, "month", None, None, None, DEFAULT_PERCENTILES, 10)
+    print(f"{'summary':<10}{time.perf_counter() - start:>10.3f}s")
+
+    get_ppe_compliance_analytics(db)
+    start = time.perf_counter()
+    get_ppe_compliance_analytics(db)
+    print(f"{'cached':<10}{time.perf_counter() - start:>10.3f}s")
+    db.close()
+
+if __name__ == "__main__":
+    main()
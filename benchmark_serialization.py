@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Per-row response serialization cost, before and after the orjson row serializers.
+
+Loads incident rows from a scratch database and times turning them into a
+response body two ways:
+
+  legacy      ORM objects -> SafetyIncidentResponse -> jsonable_encoder -> JSONResponse
+  serializer  SELECTed row tuples -> incident_serializer -> FastJSONResponse
+
+When pyarrow or msgpack are installed, the columnar encodings of the same
+rows (RowSerializer.to_columns -> Arrow IPC / MessagePack) are timed too.
+Only serialization is timed; the rows are loaded once up front.
+
+    python benchmark_serialization.py [--rows 1000] [--repeat 20]
+"""
+import argparse
+import importlib.util
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def best_of(repeat: int, function) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.database import engine, SessionLocal
+    from app.models import Base, Location, SafetyIncident
+    from app.schemas import SafetyIncidentResponse
+    from app.services.incident_service import incident_serializer
+    from app.services.columnar import COLUMNAR_PACKAGES, encode_columns
+    from app.services.serializers import FastJSONResponse
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(Location(location_name="Benchmark Floor"))
+    db.flush()
+    start = datetime(2024, 1, 1, 8, 30)
+    db.add_all(
+        SafetyIncident(
+            date_time=start + timedelta(hours=number),
+            location_id=1,
+            incident_type="Benchmark",
+            description=f"Benchmark incident {number}",
+            injury_severity="Minor",
+            reporter_name="Benchmark Reporter",
+            status="Open"
+        )
+        for number in range(args.rows)
+    )
+    db.commit()
+
+    incidents = db.query(SafetyIncident).all()
+    rows = db.query(*SafetyIncident.__table__.columns).all()
+    db.close()
+
+    def legacy() -> bytes:
+        payload = [SafetyIncidentResponse.model_validate(incident).model_dump() for incident in incidents]
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    def serializer() -> bytes:
+        return FastJSONResponse(incident_serializer.to_list(rows)).body
+
+    if legacy() != serializer():
+        raise SystemExit("legacy and serializer bodies differ")
+
+    paths = {"legacy": legacy, "serializer": serializer}
+    for file_format, package in COLUMNAR_PACKAGES.items():
+        if importlib.util.find_spec(package) is not None:
+            paths[file_format] = lambda file_format=file_format: encode_columns(
+                file_format, incident_serializer.to_columns(rows)
+            )
+
+    print(f"{len(rows)} rows, best of {args.repeat}")
+    print(f"{'path':<12}{'us/row':>10}{'bytes':>10}")
+    timings = {}
+    for name, function in paths.items():
+        timings[name] = best_of(args.repeat, function)
+        print(f"{name:<12}{timings[name] / len(rows) * 1e6:>10.2f}{len(function()):>10}")
+    print(f"speedup {timings['legacy'] / timings['serializer']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Mixed read/write throughput benchmark for the SQLite storage profiles.
+
+Runs reader and writer threads against a scratch database through the
+service layer, once with SQLITE_PROFILE=default and once with
+SQLITE_PROFILE=concurrent, and prints operations per second for each.
+
+    python benchmark_storage_profile.py [--readers 8] [--writers 4] [--seconds 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+def run_profile(readers: int, writers: int, seconds: float):
+    from app.database import engine, SessionLocal
+    from app.models import Base, Location
+    from app.schemas import SafetyIncidentCreate
+    from app.services.incident_service import SafetyIncidentService
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(Location(location_name="Benchmark Floor"))
+    db.commit()
+    db.close()
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.time() + seconds
+
+    def worker(kind: str):
+        done = errors = 0
+        while time.time() < deadline:
+            db = SessionLocal()
+            try:
+                service = SafetyIncidentService(db)
+                if kind == "writes":
+                    service.create_incident(SafetyIncidentCreate(
+                        date_time=datetime.utcnow(), location_id=1, incident_type="Benchmark"
+                    ))
+                else:
+                    service.get_incidents(limit=50)
+                done += 1
+            except Exception:
+                errors += 1
+            finally:
+                db.close()
+        with lock:
+            counts[kind] += done
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=worker, args=("reads",)) for _ in range(readers)]
+    threads += [threading.Thread(target=worker, args=("writes",)) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"{counts['reads'] / seconds:.0f} {counts['writes'] / seconds:.0f} {counts['errors']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_profile(args.readers, args.writers, args.seconds)
+        return
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s per profile")
+    print(f"{'profile':<12}{'reads/s':>10}{'writes/s':>10}{'errors':>8}")
+    for profile in ("default", "concurrent"):
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(
+                os.environ,
+                SQLITE_PROFILE=profile,
+                DATABASE_URL=f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+            )
+            output = subprocess.run(
+                [sys.executable, __file__, "--worker", "--readers", str(args.readers),
+                 "--writers", str(args.writers), "--seconds", str(args.seconds)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout.split()
+            reads, writes, errors = output[-3:]
+            print(f"{profile:<12}{reads:>10}{writes:>10}{errors:>8}")
+
+if __name__ == "__main__":
+    main()
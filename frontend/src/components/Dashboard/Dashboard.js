@@ -17,12 +17,14 @@ import {
   TrendingUp as TrendingUpIcon,
   Warning as WarningIcon,
 } from '@mui/icons-material';
-import { incidentAPI } from '../../services/api';
+import { incidentAPI, dashboardAPI } from '../../services/api';
 
 function Dashboard() {
   const [dashboardData, setDashboardData] = useState({
     totalIncidents: 0,
     openIncidents: 0,
+    totalTrainings: 0,
+    totalInspections: 0,
     recentIncidents: [],
   });
   const [loading, setLoading] = useState(true);
@@ -35,13 +37,18 @@ function Dashboard() {
   const fetchDashboardData = async () => {
     try {
       setLoading(true);
-      const response = await incidentAPI.getAll(0, 10);
-      const incidents = response.data;
+      const [summaryResponse, incidentsResponse] = await Promise.all([
+        dashboardAPI.getSummary(),
+        incidentAPI.getRecent(5),
+      ]);
+      const summary = summaryResponse.data;
       
       setDashboardData({
-        totalIncidents: incidents.length,
-        openIncidents: incidents.filter(incident => incident.status === 'Open').length,
-        recentIncidents: incidents.slice(0, 5),
+        totalIncidents: summary.incidents.total,
+        openIncidents: summary.incidents.open,
+        totalTrainings: summary.trainings.total,
+        totalInspections: summary.inspections.total,
+        recentIncidents: incidentsResponse.data,
       });
     } catch (err) {
       setError('Failed to fetch dashboard data');
@@ -116,7 +123,7 @@ function Dashboard() {
         <Grid item xs={12} sm={6} md={3}>
           <StatCard
             title="Training Sessions"
-            value="12"
+            value={dashboardData.totalTrainings}
             icon={<SchoolIcon fontSize="large" />}
             color="success"
           />
@@ -125,7 +132,7 @@ function Dashboard() {
         <Grid item xs={12} sm={6} md={3}>
           <StatCard
             title="Inspections"
-            value="8"
+            value={dashboardData.totalInspections}
             icon={<FactCheckIcon fontSize="large" />}
             color="info"
           />
@@ -89,7 +89,7 @@ function PPEComplianceForm() {
 
   const fetchEmployees = useCallback(async () => {
     try {
-      const response = await employeeAPI.getAll();
+      const response = await employeeAPI.getAll({ all: true, fields: 'employee_id,name,department' });
       setEmployees(response.data || []);
     } catch (err) {
       console.error('Failed to fetch employees:', err);
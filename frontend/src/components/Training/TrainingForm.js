@@ -81,7 +81,7 @@ function TrainingForm() {
 
   const fetchEmployees = useCallback(async () => {
     try {
-      const response = await employeeAPI.getAll();
+      const response = await employeeAPI.getAll({ all: true, fields: 'employee_id,employee_name' });
       setEmployees(response.data || []);
     } catch (err) {
       console.error('Failed to fetch employees:', err);
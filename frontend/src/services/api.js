@@ -39,6 +39,7 @@ api.interceptors.response.use(
 // Incident API endpoints
 export const incidentAPI = {
   getAll: (skip = 0, limit = 100) => api.get(`/incidents/?skip=${skip}&limit=${limit}`),
+  getRecent: (limit = 5) => api.get(`/incidents/?limit=${limit}&sort=-date_time`),
   getById: (id) => api.get(`/incidents/${id}`),
   create: (data) => api.post('/incidents/', data),
   update: (id, data) => api.put(`/incidents/${id}`, data),
@@ -83,11 +84,17 @@ export const locationAPI = {
 
 // Employee API endpoints
 export const employeeAPI = {
-  getAll: () => api.get('/employees/'),
+  // params: { skip, limit, cursor, department, fields }, e.g. { fields: 'employee_id,name' }
+  getAll: (params = {}) => api.get('/employees/', { params }),
   getById: (id) => api.get(`/employees/${id}`),
   create: (data) => api.post('/employees/', data),
   update: (id, data) => api.put(`/employees/${id}`, data),
   delete: (id) => api.delete(`/employees/${id}`),
 };
 
+// Dashboard API endpoints
+export const dashboardAPI = {
+  getSummary: () => api.get('/dashboard/summary'),
+};
+
 export default api;
@@ -1,5 +1,7 @@
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.config import settings
 from app.database import engine
 from app.models import Base
 from app.api.v1 import api_router
@@ -13,6 +15,11 @@ app = FastAPI(
     version="1.0.0"
 )
 
+@app.on_event("startup")
+def configure_threadpool():
+    """Bound the threadpool that runs the synchronous (def) routes and their DB sessions"""
+    to_thread.current_default_thread_limiter().total_tokens = settings.worker_threads
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +27,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],
 )
 
 # Include API routes
@@ -0,0 +1,59 @@
+from logging.config import fileConfig
+from alembic import context
+from app.config import settings
+from app.database import engine
+from app.models import Base
+from app.models.search import FTS_TABLES
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+FTS_TABLE_NAMES = tuple(spec["fts_table"] for spec in FTS_TABLES.values())
+
+def include_name(name, type_, parent_names):
+    """Leave the FTS5 virtual tables and their shadow tables out of autogenerate"""
+    if type_ == "table":
+        return not name.startswith(FTS_TABLE_NAMES)
+    return True
+
+def run_migrations_offline():
+    """Emit SQL for the migrations without connecting to the database"""
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
+        render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    """Run the migrations against the application's engine"""
+    with engine.connect() as connection:
+        is_sqlite = connection.dialect.name == "sqlite"
+        if is_sqlite:
+            # Batch migrations rebuild tables, which SQLite wants done with foreign keys off;
+            # this also keeps orphaned rows from older databases through the copy
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            connection.commit()
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+            render_as_batch=True
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+        if is_sqlite:
+            connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+            connection.commit()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
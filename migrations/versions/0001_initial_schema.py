@@ -0,0 +1,110 @@
+"""Initial schema
+
+Tables as created by Base.metadata.create_all before migrations were
+introduced. Tables that already exist are left alone, so databases created
+by earlier versions of the app can be upgraded in place.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def _create_table(name, *columns):
+    if name in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(name, *columns)
+    for column in columns:
+        if isinstance(column, sa.Column) and column.primary_key and isinstance(column.type, sa.Integer):
+            op.create_index(f"ix_{name}_{column.name}", name, [column.name])
+
+def upgrade():
+    _create_table(
+        "locations",
+        sa.Column("location_id", sa.Integer(), primary_key=True),
+        sa.Column("location_name", sa.String(100), nullable=False),
+    )
+    _create_table(
+        "employees",
+        sa.Column("employee_id", sa.Integer(), primary_key=True),
+        sa.Column("employee_name", sa.String(100), nullable=False),
+        sa.Column("employee_code", sa.String(50), nullable=False, unique=True),
+        sa.Column("first_name", sa.String(50)),
+        sa.Column("last_name", sa.String(50)),
+        sa.Column("department", sa.String(100)),
+    )
+    _create_table(
+        "safety_incidents",
+        sa.Column("incident_id", sa.Integer(), primary_key=True),
+        sa.Column("date_time", sa.DateTime(), nullable=False),
+        sa.Column("location_id", sa.Integer(), sa.ForeignKey("locations.location_id"), nullable=False),
+        sa.Column("incident_type", sa.String(100), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("injury_severity", sa.String(50)),
+        sa.Column("reporter_name", sa.String(100)),
+        sa.Column("status", sa.String(50)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    _create_table(
+        "safety_trainings",
+        sa.Column("training_id", sa.Integer(), primary_key=True),
+        sa.Column("training_type", sa.String(100), nullable=False),
+        sa.Column("completion_date", sa.Date(), nullable=False),
+        sa.Column("expiry_date", sa.Date()),
+        sa.Column("trainer_name", sa.String(100)),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    _create_table(
+        "training_participants",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("training_id", sa.Integer(), sa.ForeignKey("safety_trainings.training_id"), nullable=False),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.employee_id"), nullable=False),
+    )
+    _create_table(
+        "safety_inspections",
+        sa.Column("inspection_id", sa.Integer(), primary_key=True),
+        sa.Column("inspection_type", sa.String(100), nullable=False),
+        sa.Column("inspection_date", sa.Date(), nullable=False),
+        sa.Column("inspection_time", sa.Time()),
+        sa.Column("location_id", sa.Integer(), sa.ForeignKey("locations.location_id"), nullable=False),
+        sa.Column("inspector_name", sa.String(100)),
+        sa.Column("notes", sa.Text()),
+        sa.Column("status", sa.String(50)),
+        sa.Column("score", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    _create_table(
+        "ppe_compliance",
+        sa.Column("ppe_id", sa.Integer(), primary_key=True),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.employee_id"), nullable=False),
+        sa.Column("assessment_date", sa.Date()),
+        sa.Column("helmet_compliance", sa.Integer()),
+        sa.Column("safety_glasses_compliance", sa.Integer()),
+        sa.Column("gloves_compliance", sa.Integer()),
+        sa.Column("safety_shoes_compliance", sa.Integer()),
+        sa.Column("vest_compliance", sa.Integer()),
+        sa.Column("violations", sa.Integer()),
+        sa.Column("status", sa.String(50)),
+        sa.Column("assessor_name", sa.String(100)),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    if "entity_counters" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "entity_counters",
+            sa.Column("name", sa.String(100), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False),
+        )
+
+def downgrade():
+    for name in [
+        "entity_counters", "ppe_compliance", "safety_inspections", "training_participants",
+        "safety_trainings", "safety_incidents", "employees", "locations",
+    ]:
+        op.drop_table(name)
@@ -0,0 +1,40 @@
+"""Foreign key and filter column indexes
+
+Indexes the columns list, filter and join queries use, and makes each
+employee appear at most once per training.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_safety_incidents_date_time", "safety_incidents", ["date_time"], False),
+    ("ix_safety_incidents_location_id_date_time", "safety_incidents", ["location_id", "date_time"], False),
+    ("ix_safety_incidents_status_date_time", "safety_incidents", ["status", "date_time"], False),
+    ("ix_safety_inspections_inspection_date", "safety_inspections", ["inspection_date"], False),
+    ("ix_safety_inspections_location_id_inspection_date", "safety_inspections", ["location_id", "inspection_date"], False),
+    ("ix_ppe_compliance_employee_id_assessment_date", "ppe_compliance", ["employee_id", "assessment_date"], False),
+    ("ix_training_participants_employee_id", "training_participants", ["employee_id"], False),
+    ("uq_training_participants_training_id_employee_id", "training_participants", ["training_id", "employee_id"], True),
+]
+
+def upgrade():
+    # Keep the first enrolment of any duplicated (training_id, employee_id) pair
+    op.execute(sa.text(
+        "DELETE FROM training_participants WHERE id NOT IN ("
+        "SELECT MIN(id) FROM training_participants GROUP BY training_id, employee_id)"
+    ))
+    for name, table, columns, unique in INDEXES:
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+
+def downgrade():
+    for name, table, columns, unique in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,55 @@
+"""Full-text search over incident and inspection text
+
+Adds FTS5 external-content indexes over safety_incidents (incident_type,
+description) and safety_inspections (inspection_type, notes), the triggers
+that keep them in sync, and builds them from the existing rows.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+FTS_TABLES = [
+    ("safety_incidents", "safety_incidents_fts", "incident_id", ["incident_type", "description"]),
+    ("safety_inspections", "safety_inspections_fts", "inspection_id", ["inspection_type", "notes"]),
+]
+
+def upgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table, fts, key, column_list in FTS_TABLES:
+        columns = ", ".join(column_list)
+        new_values = ", ".join(f"new.{column}" for column in column_list)
+        old_values = ", ".join(f"old.{column}" for column in column_list)
+        op.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{columns}, content='{table}', content_rowid='{key}', tokenize='porter unicode61')"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.{key}, {new_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.{key}, {old_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.{key}, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.{key}, {new_values}); END"
+        )
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table, fts, key, column_list in FTS_TABLES:
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
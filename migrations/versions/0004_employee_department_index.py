@@ -0,0 +1,20 @@
+"""Employee department index
+
+Backs the department filter of the employee directory.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index("ix_employees_department", "employees", ["department"], if_not_exists=True)
+
+def downgrade():
+    op.drop_index("ix_employees_department", table_name="employees", if_exists=True)
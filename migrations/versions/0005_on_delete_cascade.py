@@ -0,0 +1,41 @@
+"""ON DELETE CASCADE foreign keys
+
+Training participants are removed with their training or employee, and PPE
+compliance records with their employee, by the database itself. SQLite
+cannot alter a constraint, so both tables are rebuilt in batch mode.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# Names reflected foreign keys are given so that the unnamed originals can be dropped
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+FOREIGN_KEYS = [
+    ("training_participants", "training_id", "safety_trainings", "training_id"),
+    ("training_participants", "employee_id", "employees", "employee_id"),
+    ("ppe_compliance", "employee_id", "employees", "employee_id"),
+]
+
+def _recreate_foreign_keys(ondelete):
+    for table in dict.fromkeys(table for table, _, _, _ in FOREIGN_KEYS):
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for source_table, column, referent, remote_column in FOREIGN_KEYS:
+                if source_table != table:
+                    continue
+                name = f"fk_{table}_{column}_{referent}"
+                batch_op.drop_constraint(name, type_="foreignkey")
+                batch_op.create_foreign_key(name, referent, [column], [remote_column], ondelete=ondelete)
+
+def upgrade():
+    _recreate_foreign_keys("CASCADE")
+
+def downgrade():
+    _recreate_foreign_keys(None)
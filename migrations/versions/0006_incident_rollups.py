@@ -0,0 +1,46 @@
+"""Incident rollups
+
+Adds incident_rollups, the incident counts per day/week/month bucket,
+location and injury severity that the incident write paths maintain, and
+fills it from the existing incidents. The table is rebuilt rather than
+skipped when it already exists, since create_all may have made it empty.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# SQLite date modifiers giving the first day of each period; weeks start on Monday
+PERIOD_BUCKETS = {
+    "day": "date(date_time)",
+    "week": "date(date_time, '-6 days', 'weekday 1')",
+    "month": "date(date_time, 'start of month')",
+}
+
+def upgrade():
+    if "incident_rollups" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "incident_rollups",
+            sa.Column("period", sa.String(10), primary_key=True),
+            sa.Column("bucket", sa.Date(), primary_key=True),
+            sa.Column("location_id", sa.Integer(), primary_key=True),
+            sa.Column("injury_severity", sa.String(50), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False),
+        )
+    op.execute("DELETE FROM incident_rollups")
+    for period, bucket in PERIOD_BUCKETS.items():
+        op.execute(
+            "INSERT INTO incident_rollups (period, bucket, location_id, injury_severity, count) "
+            f"SELECT '{period}', {bucket}, location_id, coalesce(injury_severity, ''), count(*) "
+            f"FROM safety_incidents GROUP BY {bucket}, location_id, coalesce(injury_severity, '')"
+        )
+
+def downgrade():
+    op.drop_table("incident_rollups")
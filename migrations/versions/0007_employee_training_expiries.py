@@ -0,0 +1,51 @@
+"""Employee training expiries
+
+Adds employee_training_expiries, the latest expiry_date per employee and
+training type that the training write paths maintain, with the indexes
+behind the expiring-soon query, and fills it from the existing trainings.
+The table is rebuilt rather than skipped when it already exists, since
+create_all may have made it empty.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if "employee_training_expiries" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "employee_training_expiries",
+            sa.Column(
+                "employee_id", sa.Integer(),
+                sa.ForeignKey("employees.employee_id", ondelete="CASCADE"), primary_key=True
+            ),
+            sa.Column("training_type", sa.String(100), primary_key=True),
+            sa.Column("expiry_date", sa.Date(), nullable=False),
+            sa.Column("training_id", sa.Integer(), nullable=False),
+        )
+    op.create_index(
+        "ix_employee_training_expiries_expiry_date", "employee_training_expiries",
+        ["expiry_date", "employee_id", "training_type"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_employee_training_expiries_training_type_expiry_date", "employee_training_expiries",
+        ["training_type", "expiry_date"], if_not_exists=True
+    )
+    # SQLite fills the bare training_id column from the row that has the max() expiry_date
+    op.execute("DELETE FROM employee_training_expiries")
+    op.execute(
+        "INSERT INTO employee_training_expiries (employee_id, training_type, expiry_date, training_id) "
+        "SELECT tp.employee_id, st.training_type, max(st.expiry_date), st.training_id "
+        "FROM training_participants tp JOIN safety_trainings st ON st.training_id = tp.training_id "
+        "WHERE st.expiry_date IS NOT NULL GROUP BY tp.employee_id, st.training_type"
+    )
+
+def downgrade():
+    op.drop_table("employee_training_expiries")
@@ -0,0 +1,53 @@
+"""Inspection schedules
+
+Adds inspection_schedules, the daily, weekly and monthly recurrence rules
+the schedule generator turns into inspections, and the schedule_id column
+of safety_inspections with the unique index that keeps generated
+inspections to one per schedule, location and day.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "inspection_schedules" not in inspector.get_table_names():
+        op.create_table(
+            "inspection_schedules",
+            sa.Column("schedule_id", sa.Integer(), primary_key=True),
+            sa.Column(
+                "location_id", sa.Integer(), sa.ForeignKey("locations.location_id", ondelete="CASCADE")
+            ),
+            sa.Column("inspection_type", sa.String(100), nullable=False),
+            sa.Column("frequency", sa.String(10), nullable=False),
+            sa.Column("interval", sa.Integer(), nullable=False),
+            sa.Column("start_date", sa.Date(), nullable=False),
+            sa.Column("end_date", sa.Date()),
+            sa.Column("inspection_time", sa.Time()),
+            sa.Column("inspector_name", sa.String(100)),
+            sa.Column("notes", sa.Text()),
+            sa.Column("created_at", sa.DateTime()),
+            sqlite_autoincrement=True,
+        )
+    op.create_index(
+        "ix_inspection_schedules_location_id", "inspection_schedules", ["location_id"], if_not_exists=True
+    )
+    if "schedule_id" not in {column["name"] for column in inspector.get_columns("safety_inspections")}:
+        op.add_column("safety_inspections", sa.Column("schedule_id", sa.Integer()))
+    op.create_index(
+        "ix_safety_inspections_schedule_id_location_id_inspection_date", "safety_inspections",
+        ["schedule_id", "location_id", "inspection_date"], unique=True, if_not_exists=True
+    )
+
+def downgrade():
+    op.drop_index("ix_safety_inspections_schedule_id_location_id_inspection_date", table_name="safety_inspections")
+    op.drop_column("safety_inspections", "schedule_id")
+    op.drop_table("inspection_schedules")
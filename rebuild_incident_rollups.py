@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Recompute the incident rollups (incident counts per day, week and month by
+location and injury severity) from safety_incidents.
+
+The incident write paths keep incident_rollups up to date; run this after
+incidents were changed outside the app, e.g. with the sqlite3 shell.
+
+    python rebuild_incident_rollups.py
+"""
+from app.database import engine, SessionLocal
+from app.models import Base
+from app.services.incident_rollups import rebuild_incident_rollups
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        written = rebuild_incident_rollups(db)
+    finally:
+        db.close()
+    print(f"Wrote {written} incident rollup rows")
+
+if __name__ == "__main__":
+    main()
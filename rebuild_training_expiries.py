@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Recompute the employee training expiries (latest expiry_date per employee
+and training type) from the trainings and their participants.
+
+The training write paths keep employee_training_expiries up to date; run
+this after trainings or participants were changed outside the app.
+
+    python rebuild_training_expiries.py
+"""
+from app.database import engine, SessionLocal
+from app.models import Base
+from app.services.training_expiries import rebuild_training_expiries
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        written = rebuild_training_expiries(db)
+    finally:
+        db.close()
+    print(f"Wrote {written} training expiry rows")
+
+if __name__ == "__main__":
+    main()
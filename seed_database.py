@@ -6,6 +6,7 @@ from datetime import datetime, date
 from sqlalchemy.orm import Session
 from app.database import engine, SessionLocal
 from app.models import Base, Location, Employee, SafetyInspection, PPECompliance
+from app.services import counters  # keeps entity_counters in step with the rows seeded below
 
 def seed_database():
     # Create tables
@@ -52,6 +52,21 @@ def test_endpoint(method, endpoint, data=None, expected_status=200):
         print("-" * 50)
         return None
 
+def test_matches_get(endpoint, written_response):
+    """Check that a create or update response is the same record GET endpoint returns"""
+    if written_response is None or written_response.status_code not in (200, 201):
+        return
+    written = written_response.json()
+    response = requests.get(f"{BASE_URL}{endpoint}")
+    print(f"GET {endpoint} matches the write response")
+    if response.status_code == 200 and response.json() == written:
+        print("✅ PASS")
+    else:
+        print("❌ FAIL")
+        print(f"Written: {written}")
+        print(f"Read:    {response.text}")
+    print("-" * 50)
+
 def main():
     print("🧪 Testing Safety Management API Endpoints")
     print("=" * 60)
@@ -114,6 +129,13 @@ def main():
         "status": "Scheduled"
     }
     inspection_response = test_endpoint("POST", "/inspections/", inspection_data, 201)
+    if inspection_response is not None and inspection_response.status_code in (200, 201):
+        inspection_id = inspection_response.json()["inspection_id"]
+        test_matches_get(f"/inspections/{inspection_id}", inspection_response)
+        update_response = test_endpoint(
+            "PUT", f"/inspections/{inspection_id}", {"status": "Completed", "score": 90}
+        )
+        test_matches_get(f"/inspections/{inspection_id}", update_response)
     
     # Create PPE compliance record
     ppe_data = {